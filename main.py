@@ -1,6 +1,14 @@
 if __name__ == "__main__":
     import sys
 
+    # Headless (PyQt5 is not imported) when a command is given
+    if len(sys.argv) > 1:
+        from package.src import cli
+
+        sys.exit(cli.run())
+
+    # Times the cold start (see startup.py)
+    from package.src import startup
     from package.src.ui import mainwindow
 
     sys.exit(mainwindow.run())
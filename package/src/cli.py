@@ -0,0 +1,213 @@
+import argparse
+import sys
+import urllib.parse
+
+import requests
+
+from package.src.modules import cache
+from package.src.modules.fetch import MAX_WORKERS, SPLITTERS, Fetch
+from package.src.modules.filters import SOURCES, Filters
+from package.src.modules.search import Search
+
+FORMATS = ["fasta", "gff", "rdf/xml", "txt", "xml"]
+
+
+def get_progress(label: str, quiet: bool = False):
+    """
+    Returns a callable writing the progress (0-100) to stderr, or None if quiet.
+
+    :param label: Shown before the percentage
+    :param quiet: Do not report progress
+    """
+    if quiet:
+        return None
+
+    def progress(value):
+        # (count, percentage) of fetch, or percentage of each source
+        if isinstance(value, tuple):
+            value = value[1]
+        elif isinstance(value, dict):
+            value = sum(value.values()) / max(len(value), 1)
+        sys.stderr.write("\r{}: {}%".format(label, int(value)))
+        sys.stderr.flush()
+
+    return progress
+
+
+def search(args) -> int:
+    query = urllib.parse.quote(args.query)
+    columns = urllib.parse.quote(args.columns, safe="") if args.columns else None
+    sep = "\t" if args.format == "tsv" else ","
+
+    search = Search(query=query, columns=columns, compressed=not args.uncompressed)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    rows = 0
+    try:
+        for chunk in search.get_batches(progress=get_progress("Search", args.quiet)):
+            chunk.to_csv(out, sep=sep, index=False, header=not rows)
+            rows += chunk.shape[0]
+    except requests.HTTPError as e:
+        print("\nSearch failed ({})".format(e), file=sys.stderr)
+        return 1
+    except requests.RequestException:
+        print("\nConnection lost! Search again to resume.", file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if not rows:
+        print("No records found!", file=sys.stderr)
+        return 1
+    if not args.quiet:
+        print("\n{} records".format(rows), file=sys.stderr)
+
+    return 0
+
+
+def fetch(args) -> int:
+    ids = list(args.ids)
+    if args.input:
+        file = sys.stdin if args.input == "-" else open(args.input)
+        with file:
+            ids += [line.strip() for line in file if line.strip()]
+    if not ids:
+        print("No accessions given", file=sys.stderr)
+        return 2
+
+    fetch = Fetch(
+        ids=ids,
+        format=args.format,
+        max_workers=args.workers,
+        single=args.output is not None,
+        compression=args.compression,
+        cached=not args.no_cache,
+        output=args.output,
+    )
+    failed = fetch.run(progress=get_progress("Fetch", args.quiet))
+
+    if not args.quiet:
+        sys.stderr.write("\n")
+    for id, reason in failed.items():
+        print("{}\t{}".format(id, reason), file=sys.stderr)
+
+    return 1 if failed else 0
+
+
+def refresh(args) -> int:
+    names = [name for name in SOURCES if not args.sources or name in args.sources]
+    metadata = cache.load_metadata()
+    cached = {
+        name: metadata[name]
+        for name in names
+        if name in metadata and cache.exists(name.lower())
+    }
+
+    def done(data):
+        name, value, source_metadata = data
+        metadata[name] = source_metadata
+        cache.save_metadata(metadata)
+        if value is not None:
+            cache.write(value, name.lower())
+        if not args.quiet:
+            status = "up to date" if value is None else "updated"
+            sys.stderr.write("\r{}: {}\n".format(name, status))
+
+    failed = {}
+
+    def error(data):
+        name, reason = data
+        failed[name] = reason
+        sys.stderr.write("\r{}: failed ({})\n".format(name, reason))
+
+    progress = get_progress("Refresh", args.quiet)
+    missing = [name for name in names if name not in cached]
+    if missing:
+        Filters(names=missing).run(done=done, progress=progress, error=error)
+    if cached:
+        Filters(names=list(cached), validators=cached, refresh=not args.force).run(
+            done=done, progress=progress, error=error
+        )
+
+    return 1 if failed else 0
+
+
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="uniget",
+        description="Search, filter, and fetch records from the UniProt database.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    search_parser = subparsers.add_parser(
+        "search", help="Search UniProtKB, streaming the results as a table"
+    )
+    search_parser.add_argument("query", help='e.g. "insulin AND reviewed:true"')
+    search_parser.add_argument(
+        "-c", "--columns", help="Extra fields, comma-separated (e.g. cc_function)"
+    )
+    search_parser.add_argument("-f", "--format", choices=["tsv", "csv"], default="tsv")
+    search_parser.add_argument(
+        "-o", "--output", default="-", help="File (default: stdout)"
+    )
+    search_parser.add_argument(
+        "--uncompressed",
+        action="store_true",
+        help="Do not request gzip-compressed pages",
+    )
+    search_parser.set_defaults(func=search)
+
+    fetch_parser = subparsers.add_parser(
+        "fetch", help="Download UniProt entries (to export/, unless --output is given)"
+    )
+    fetch_parser.add_argument("ids", nargs="*", help="UniProt accession numbers")
+    fetch_parser.add_argument(
+        "-i", "--input", help="File with one accession per line (- for stdin)"
+    )
+    fetch_parser.add_argument("-f", "--format", choices=FORMATS, default="fasta")
+    fetch_parser.add_argument(
+        "-o", "--output", help="Single multi-record file (- for stdout)"
+    )
+    fetch_parser.add_argument("-z", "--compression", choices=["gzip", "bgzip"])
+    fetch_parser.add_argument("-w", "--workers", type=int, default=MAX_WORKERS)
+    fetch_parser.add_argument(
+        "--no-cache", action="store_true", help="Do not use the local record store"
+    )
+    fetch_parser.set_defaults(func=fetch)
+
+    refresh_parser = subparsers.add_parser(
+        "refresh", help="Download or update the cached reference datasets"
+    )
+    refresh_parser.add_argument(
+        "sources", nargs="*", help="{} (default: all)".format(", ".join(SOURCES))
+    )
+    refresh_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Revalidate even if the release is unchanged",
+    )
+    refresh_parser.set_defaults(func=refresh)
+
+    for subparser in [search_parser, fetch_parser, refresh_parser]:
+        subparser.add_argument(
+            "-q", "--quiet", action="store_true", help="Do not report progress"
+        )
+
+    return parser
+
+
+def run(argv: list = None) -> int:
+    parser = get_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "refresh":
+        unknown = [name for name in args.sources if name not in SOURCES]
+        if unknown:
+            parser.error("unknown sources: {}".format(", ".join(unknown)))
+    if args.command == "fetch" and args.output is not None:
+        if args.format not in SPLITTERS:
+            parser.error("{} cannot be written to a single file".format(args.format))
+        if args.output == "-" and args.compression == "bgzip":
+            parser.error("bgzip cannot be written to stdout")
+
+    return args.func(args)
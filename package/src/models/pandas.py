@@ -1,4 +1,8 @@
-from PyQt5.QtCore import QAbstractTableModel, Qt
+import re
+
+import numpy as np
+import pandas as pd
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
 from PyQt5.QtGui import QBrush, QColor, QPixmap
 
 
@@ -7,65 +11,109 @@ class PandasModel(QAbstractTableModel):
         QAbstractTableModel.__init__(self)
         self._data = data
 
-        try:
-            # Color (normalized) for the length (bp) and mass (Da) of each record
-            self.length_normalized_color = (
-                self._data["Length"].values / max(self._data["Length"].values) * 100
-            )
-            self.mass_normalized_color = (
-                self._data["Mass"].values / max(self._data["Mass"].values) * 100
-            )
-        except:
-            pass
+        # Materialize each column once (avoids a pandas lookup per cell and role)
+        self._columns = [
+            self._data.iloc[:, n].to_numpy(dtype=object)
+            for n in range(self._data.shape[1])
+        ]
+
+        self._backgrounds = {}
+        self.set_backgrounds()
+        self._checkable_brush = QBrush(QColor("#f1f0e8"))
+        self._review_brushes = {
+            "Unreviewed": QBrush(QColor("#d62d20")),
+            "Reviewed": QBrush(QColor("#008744")),
+        }
+
+        # Set state of checkboxes (only the first column is checkable)
+        self._checked = np.zeros(self._data.shape[0], dtype=bool)
+
+        # Rows shown (positions in the DataFrame) and active filters {column: pattern}
+        self._rows = np.arange(self._data.shape[0])
+        self._mask = np.ones(self._data.shape[0], dtype=bool)
+        self._filters = {}
+        # Text of each filtered column, computed once
+        self._text = {}
+
+        # Current sort permutation, and cached ones {(column, order): permutation}
+        self._order = None
+        self._orders = {}
+
+    def set_backgrounds(self):
+        # Background of the length (bp) and mass (Da) of each record
+        # Per-row alpha (normalized) and one brush per alpha value
+        for n, name, rgb in [
+            (6, "Length", (100, 100, 255)),
+            (7, "Mass", (255, 100, 100)),
+        ]:
+            if self.columnCount() > n and self._data.columns[n] == name:
+                values = np.nan_to_num(self._data[name].to_numpy(dtype=float))
+                alpha = (values / max(values.max(), 1) * 100).astype(np.uint8)
+                brushes = [QBrush(QColor(*rgb, a)) for a in range(101)]
+                self._backgrounds[n] = (alpha, brushes)
+
+    def append(self, data: pd.DataFrame):
+        """
+        Appends rows (e.g. a batch of records still being downloaded).
+
+        New rows are shown at the end; filters and sorting are applied again by calling set_filter/sort.
 
-        # Set state of checkboxes
-        self._checked = [
-            [False for i in range(self.columnCount())] for j in range(self.rowCount())
+        :param data: DataFrame with the same columns
+        """
+        if data.empty:
+            return
+
+        start, n = self._data.shape[0], data.shape[0]
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + n - 1)
+        self._data = pd.concat([self._data, data], ignore_index=True)
+        self._columns = [
+            np.concatenate([column, data.iloc[:, i].to_numpy(dtype=object)])
+            for i, column in enumerate(self._columns)
         ]
+        self.set_backgrounds()
+        self._checked = np.concatenate([self._checked, np.zeros(n, dtype=bool)])
+        self._mask = np.concatenate([self._mask, np.ones(n, dtype=bool)])
+        self._rows = np.concatenate([self._rows, np.arange(start, start + n)])
+        # Cached text and permutations no longer cover all rows
+        self._text, self._orders, self._order = {}, {}, None
+        self.endInsertRows()
+
+    def get_data(self) -> pd.DataFrame:
+        return self._data
 
     def rowCount(self, parent=None):
-        return self._data.shape[0]
+        return len(self._rows)
 
     def columnCount(self, parent=None):
         return self._data.shape[1]
 
     def data(self, index, role=Qt.DisplayRole):
-        data = self._data.iloc[index.row(), index.column()]
-        if index.isValid():
-            if role == Qt.ToolTipRole:
-                text = str(data).replace(") (", ")\n(")
-                return text
-            if role == Qt.BackgroundRole and index.column() == 0:
-                return QBrush(QColor("#f1f0e8"))
-            if (
-                role == Qt.BackgroundRole
-                and index.column() == 6
-                and self._data.columns[6] == "Length"
-            ):
-                return QBrush(
-                    QColor(
-                        100, 100, 255, int(self.length_normalized_color[index.row()])
-                    )
-                )
-            if (
-                role == Qt.BackgroundRole
-                and index.column() == 7
-                and self._data.columns[7] == "Mass"
-            ):
-                return QBrush(
-                    QColor(255, 100, 100, int(self.mass_normalized_color[index.row()]))
-                )
-            if role == Qt.ForegroundRole and data == "Unreviewed":
-                return QBrush(QColor("#d62d20"))
-            if role == Qt.ForegroundRole and data == "Reviewed":
-                return QBrush(QColor("#008744"))
-            if role == Qt.DisplayRole:
-                return str(data)
-            if role == Qt.TextAlignmentRole:
-                return Qt.AlignCenter
-            # Add checkboxes to first column to allow selection of IDs
-            if role == Qt.CheckStateRole and index.column() == 0:
-                return self._checked[index.row()][index.column()]
+        if not index.isValid():
+            return None
+
+        # Look up the cell only for the requested role
+        row, col = self._rows[index.row()], index.column()
+        if role == Qt.DisplayRole:
+            return str(self._columns[col][row])
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role == Qt.BackgroundRole:
+            if col == 0:
+                return self._checkable_brush
+            if col in self._backgrounds:
+                alpha, brushes = self._backgrounds[col]
+                return brushes[alpha[row]]
+            return None
+        if role == Qt.ForegroundRole:
+            value = self._columns[col][row]
+            if isinstance(value, str):
+                return self._review_brushes.get(value)
+            return None
+        if role == Qt.ToolTipRole:
+            return str(self._columns[col][row]).replace(") (", ")\n(")
+        # Add checkboxes to first column to allow selection of IDs
+        if role == Qt.CheckStateRole and col == 0:
+            return Qt.Checked if self._checked[row] else Qt.Unchecked
         return None
 
     def flags(self, index):
@@ -85,6 +133,162 @@ class PandasModel(QAbstractTableModel):
     def setData(self, index, value, role):
         if not index.isValid() or role != Qt.CheckStateRole:
             return False
-        self._checked[index.row()][index.column()] = value
+        self._checked[self._rows[index.row()]] = bool(value)
         self.dataChanged.emit(index, index)
         return True
+
+    def emit_checked(self):
+        # One signal for the whole checkable column
+        if self.rowCount():
+            self.dataChanged.emit(
+                self.index(0, 0),
+                self.index(self.rowCount() - 1, 0),
+                [Qt.CheckStateRole],
+            )
+
+    def get_mask(self, column: int, pattern: str) -> np.ndarray:
+        """
+        Returns the rows whose column matches a pattern (case insensitive regex, literal if invalid).
+
+        :param column: Position of the column
+        :param pattern: Regular expression
+        """
+        if column not in self._text:
+            self._text[column] = self._data.iloc[:, column].astype(str)
+        text = self._text[column]
+        # Case is ignored by the match, not by lowercasing the pattern (e.g. \W, \S)
+        try:
+            mask = text.str.contains(pattern, case=False, regex=True)
+        except re.error:
+            mask = text.str.contains(pattern, case=False, regex=False)
+
+        return mask.to_numpy()
+
+    def get_rows(self) -> np.ndarray:
+        """
+        Returns the positions of the rows shown (i.e. passing all filters).
+        """
+        return self._rows
+
+    def set_filter(self, column: int, pattern: str):
+        """
+        Filters the rows on a column; filters on several columns are combined.
+
+        :param column: Position of the column
+        :param pattern: Regular expression (removes the filter if empty)
+        """
+        if pattern:
+            self._filters[column] = pattern
+        else:
+            self._filters.pop(column, None)
+
+        mask = np.ones(self._data.shape[0], dtype=bool)
+        for col, pat in self._filters.items():
+            mask &= self.get_mask(column=col, pattern=pat)
+
+        self.beginResetModel()
+        self._mask = mask
+        self.update_rows()
+        self.endResetModel()
+
+    def update_rows(self):
+        if self._order is None:
+            self._rows = np.flatnonzero(self._mask)
+        else:
+            self._rows = self._order[self._mask[self._order]]
+
+    def get_order(self, column: int, order: Qt.SortOrder) -> np.ndarray:
+        """
+        Returns the permutation sorting a column (cached per column and direction).
+
+        :param column: Position of the column
+        :param order: Qt.AscendingOrder or Qt.DescendingOrder
+        """
+        key = (column, order)
+        if key not in self._orders:
+            # Typed values (e.g. numeric length/mass), not their displayed text
+            values = self._data.iloc[:, column].reset_index(drop=True)
+            ascending = order == Qt.AscendingOrder
+            try:
+                values = values.sort_values(ascending=ascending, kind="mergesort")
+            except TypeError:
+                # Mixed types
+                values = values.astype(str).sort_values(
+                    ascending=ascending, kind="mergesort"
+                )
+            self._orders[key] = values.index.to_numpy()
+
+        return self._orders[key]
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column < 0 or column >= self.columnCount():
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        rows = [self._rows[index.row()] for index in persistent]
+
+        self._order = self.get_order(column=column, order=order)
+        self.update_rows()
+
+        # Keep persistent indexes (e.g. current selection) on the same records
+        position = np.full(self._data.shape[0], -1)
+        position[self._rows] = np.arange(len(self._rows))
+        self.changePersistentIndexList(
+            persistent,
+            [
+                self.index(int(position[row]), index.column())
+                for row, index in zip(rows, persistent)
+            ],
+        )
+        self.layoutChanged.emit()
+
+    def get_checked(self, shown: bool = False) -> np.ndarray:
+        """
+        Returns the positions of the checked rows.
+
+        :param shown: Only the rows shown (i.e. passing all filters), in their displayed order
+        """
+        if shown:
+            return self._rows[self._checked[self._rows]]
+        return np.flatnonzero(self._checked)
+
+    def set_checked(self, value: bool = True, mask=None):
+        """
+        Checks (or unchecks) rows in bulk.
+
+        :param value: State of the checkboxes
+        :param mask: Boolean array or row positions (all rows if None)
+        """
+        if mask is None:
+            self._checked[:] = value
+        else:
+            self._checked[mask] = value
+        self.emit_checked()
+
+    def invert_checked(self, mask=None):
+        """
+        Inverts the state of the checkboxes.
+
+        :param mask: Boolean array or row positions (all rows if None)
+        """
+        if mask is None:
+            np.logical_not(self._checked, out=self._checked)
+        else:
+            self._checked[mask] = ~self._checked[mask]
+        self.emit_checked()
+
+    def check_where(self, column: int, pattern: str, value: bool = True):
+        """
+        Checks (or unchecks) the rows whose column matches a pattern (case insensitive regex).
+
+        :param column: Position of the column
+        :param pattern: Regular expression (all rows if empty)
+        :param value: State of the checkboxes
+        """
+        if not pattern:
+            self.set_checked(value=value)
+            return
+        self.set_checked(
+            value=value, mask=self.get_mask(column=column, pattern=pattern)
+        )
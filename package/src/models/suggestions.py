@@ -0,0 +1,103 @@
+import bisect
+import heapq
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+# Suggestions shown at once
+LIMIT = 50
+
+
+class SearchIndex:
+    """
+    Prefix and substring index over the search terms of each entry (e.g. scientific name, code, and taxon).
+
+    Prefix matches are found by bisection over the sorted terms, and listed first. Substring matches follow, in entry
+    order. When a query extends the previous one, only the entries matched by the previous one are scanned, so
+    suggestions are computed incrementally while typing.
+
+    :param terms: Search terms of each entry
+    """
+
+    def __init__(self, terms: list):
+        self._terms = [[str(term).lower() for term in entry] for entry in terms]
+        # (term, entry) of all entries, sorted
+        pairs = sorted(
+            (term, n) for n, entry in enumerate(self._terms) for term in entry
+        )
+        self._keys = [term for term, _ in pairs]
+        self._entries = [n for _, n in pairs]
+
+        # Previous query and the entries containing it
+        self._last = ("", None)
+
+    def find(self, text: str) -> set:
+        """
+        Returns the entries with a search term equal to text (case-insensitive).
+        """
+        text = text.strip().lower()
+        start = bisect.bisect_left(self._keys, text)
+        end = bisect.bisect_right(self._keys, text, lo=start)
+        return set(self._entries[start:end])
+
+    def search(self, text: str, limit: int = LIMIT) -> list:
+        """
+        Returns the entries with a search term starting with text, then those with a term containing it.
+
+        :param text: Query (case-insensitive)
+        :param limit: Maximum number of entries returned
+        """
+        text = text.strip().lower()
+        if not text:
+            self._last = ("", None)
+            return []
+
+        # Prefix matches, ordered by term
+        start = bisect.bisect_left(self._keys, text)
+        end = bisect.bisect_left(self._keys, text + "\uffff", lo=start)
+        found = list(dict.fromkeys(self._entries[start:end]))
+
+        # Substring matches, narrowed down from the previous query if possible
+        last, matches = self._last
+        if matches is None or not text.startswith(last):
+            matches = range(len(self._terms))
+        matches = [n for n in matches if any(text in term for term in self._terms[n])]
+        self._last = (text, matches)
+
+        if len(found) < limit:
+            prefixed = set(found)
+            found += heapq.nsmallest(
+                limit - len(found), (n for n in matches if n not in prefixed)
+            )
+
+        return found[:limit]
+
+
+class SuggestionModel(QAbstractListModel):
+    """
+    List model of the suggested entries, holding only their positions (labels are shared with the selector).
+
+    :param labels: Label of each entry
+    """
+
+    def __init__(self, labels: list, parent=None):
+        QAbstractListModel.__init__(self, parent)
+        self._labels = labels
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.EditRole):
+            return self._labels[self._rows[index.row()]]
+        return None
+
+    def set_labels(self, labels: list):
+        self.beginResetModel()
+        self._labels, self._rows = labels, []
+        self.endResetModel()
+
+    def set_rows(self, rows: list):
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
@@ -0,0 +1,266 @@
+import asyncio
+import shutil
+import zlib
+
+import requests
+
+from package.src.modules.fetch import (
+    BATCH_SIZE,
+    BATCH_URL,
+    MAX_WORKERS,
+    SPLITTERS,
+    TIMEOUT,
+    classify,
+    classify_status,
+)
+from package.src.modules.filters import Filters
+from package.src.modules.retry import ERRORS, RETRIES, get_delay, is_transient
+from package.src.modules.search import COMPRESSED, Search
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Errors worth retrying, also raised by aiohttp
+if aiohttp is not None:
+    ERRORS += (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+async def iterate(generator):
+    """
+    Yields the items of a blocking generator, each one computed on a worker thread.
+
+    :param generator: Generator (e.g. Search.get_batches())
+    """
+    end = object()
+    try:
+        while True:
+            item = await asyncio.to_thread(next, generator, end)
+            if item is end:
+                return
+            yield item
+    finally:
+        await asyncio.to_thread(generator.close)
+
+
+async def search(
+    query, columns: str = None, compressed: bool = COMPRESSED, client=None
+):
+    """
+    Yields the results of a UniProtKB search in DataFrames: the records of an interrupted run first (see Search), then
+    one page at a time, as they arrive.
+
+    Pages are requested through Client (shared retry policy, no thread held while waiting); only parsing and
+    checkpointing each page run on a worker thread.
+
+    :param query: URL-encoded UniProt query
+    :param columns: Extra fields (URL-encoded, comma-separated)
+    :param compressed: Request gzip-compressed pages
+    :param client: Client shared with other calls (a new one if None)
+    :raises requests.HTTPError: If a page is rejected, or still failing after the retries (the search can be resumed,
+        unless rejected)
+    """
+    if client is None:
+        async with Client() as client:
+            async for chunk in search(query, columns, compressed, client):
+                yield chunk
+        return
+
+    engine = Search(query=query, columns=columns, compressed=compressed)
+    async for chunk in iterate(engine.get_checkpoint()):
+        yield engine.format_page(chunk)
+
+    while engine.next_url:
+        status, headers, content = await client.get(engine.next_url)
+        if status != 200:
+            # Compression not acceptable
+            if engine.compressed and status in (406, 415):
+                engine.fall_back()
+                continue
+            # Cannot be resumed (e.g. invalid query)
+            if status in range(400, 429):
+                shutil.rmtree(engine.path, ignore_errors=True)
+            raise requests.HTTPError(
+                "{} Error for url: {}".format(status, engine.next_url)
+            )
+
+        try:
+            page = await asyncio.to_thread(engine.read_page, headers, content)
+        except (OSError, EOFError, zlib.error):
+            # Unreadable compressed body
+            if not engine.compressed:
+                raise
+            engine.fall_back()
+            continue
+        if page is None:
+            break
+
+        yield engine.format_page(page)
+
+    # Complete, checkpoint no longer needed
+    shutil.rmtree(engine.path, ignore_errors=True)
+
+
+async def load_filters(names: list = None, validators: dict = None, refresh=False):
+    """
+    Yields a (name, data, metadata) tuple for each reference dataset, in the order they are loaded (see Filters).
+
+    Blocking: Filters (with its own download threads and parser processes) runs on a thread of the default executor,
+    which it holds until all datasets are loaded, backoff waits included.
+
+    :param names: Sources to be loaded (all if None)
+    :param validators: Metadata of the previous fetch of each source
+    :param refresh: Check the current release first
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    end = object()
+
+    filters = Filters(names=names, validators=validators, refresh=refresh)
+    task = loop.run_in_executor(
+        None,
+        filters.run,
+        lambda data: loop.call_soon_threadsafe(queue.put_nowait, data),
+    )
+    task.add_done_callback(lambda _: queue.put_nowait(end))
+
+    while True:
+        item = await queue.get()
+        if item is end:
+            break
+        yield item
+
+    # Raise errors of the loader, if any
+    await task
+
+
+class Client:
+    """
+    Async HTTP client with bounded concurrency.
+
+    Uses aiohttp if it is installed; otherwise requests are sent through a requests.Session on worker threads.
+
+    :param limit: Maximum number of requests sent at once
+    """
+
+    def __init__(self, limit: int = MAX_WORKERS):
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit)
+        self.session = None
+
+    async def __aenter__(self):
+        if aiohttp is not None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit),
+                timeout=aiohttp.ClientTimeout(total=TIMEOUT),
+            )
+        else:
+            self.session = requests.Session()
+        return self
+
+    async def __aexit__(self, *args):
+        if aiohttp is not None:
+            await self.session.close()
+        else:
+            self.session.close()
+
+    def get_blocking(self, url: str, params: dict = None) -> tuple:
+        r = self.session.get(url, params=params, timeout=TIMEOUT)
+        return r.status_code, r.headers, r.content
+
+    async def get(self, url: str, params: dict = None) -> tuple:
+        """
+        Sends a GET request, retried with the shared policy (see retry): waits as asked by the server on 429, or with
+        exponential backoff on 5xx, dropped connections and timeouts.
+
+        :return: Status code, headers and content of the response
+        """
+        for attempt in range(RETRIES):
+            headers, error = None, None
+            try:
+                async with self.semaphore:
+                    if aiohttp is not None:
+                        async with self.session.get(url, params=params) as r:
+                            status, headers = r.status, r.headers
+                            content = await r.read()
+                    else:
+                        status, headers, content = await asyncio.to_thread(
+                            self.get_blocking, url, params
+                        )
+                if not is_transient(status):
+                    break
+            except ERRORS as e:
+                error = e
+
+            if attempt < RETRIES - 1:
+                await asyncio.sleep(get_delay(attempt, headers))
+
+        if error is not None:
+            raise error
+
+        return status, headers, content
+
+
+async def get_records(
+    ids: list,
+    format: str = "fasta",
+    batch_size: int = BATCH_SIZE,
+    client=None,
+    failed: dict = None,
+):
+    """
+    Yields the (accession, header, record) of each entry, fetched with concurrent batched stream queries.
+
+    Entries that are not returned (e.g. secondary or obsolete accessions) are left out. Those of batches that fail
+    (after the retries of Client.get) are reported in failed with the reason of each, as returned by Fetch.run; if
+    failed is None, an OSError is raised instead once the other entries are yielded.
+
+    :param ids: List of UniProt accession numbers
+    :param format: Format of the records (args: "txt", "fasta", "xml", "gff")
+    :param batch_size: Accessions per query
+    :param client: Client shared with other calls (a new one if None)
+    :param failed: Dict receiving the reason of each failure, by accession
+    """
+    if client is None:
+        async with Client() as client:
+            async for item in get_records(ids, format, batch_size, client, failed):
+                yield item
+        return
+
+    async def get_batch(batch: list) -> tuple:
+        params = {
+            "format": format,
+            "query": "accession:({})".format(" OR ".join(batch)),
+        }
+        try:
+            status, _, content = await client.get(BATCH_URL, params=params)
+        except ERRORS as e:
+            return batch, None, classify(e)[0]
+        if status != 200:
+            return batch, None, classify_status(status)[0]
+        return batch, content, None
+
+    errors = {}
+    batches = [ids[i : i + batch_size] for i in range(0, len(ids), batch_size)]
+    for future in asyncio.as_completed([get_batch(batch) for batch in batches]):
+        batch, content, reason = await future
+        if reason is not None:
+            errors.update(dict.fromkeys(batch, reason))
+            continue
+        requested = set(batch)
+        for accession, header, record in SPLITTERS[format](
+            content.splitlines(keepends=True)
+        ):
+            # Matched through a secondary accession
+            if accession in requested:
+                yield accession, header, record
+
+    if failed is not None:
+        failed.update(errors)
+    elif errors:
+        raise OSError(
+            "Unable to fetch {} entries ({})".format(
+                len(errors), ", ".join(sorted(set(errors.values())))
+            )
+        )
@@ -0,0 +1,129 @@
+import importlib.util
+import os
+import pickle
+import shutil
+
+# pandas and pyarrow are slow to import, so they are imported on first read or write
+FEATHER = importlib.util.find_spec("pyarrow") is not None
+
+# Column holding the DataFrame index
+INDEX = "__index__"
+
+# Freshness metadata of each source (release, validators, fetch time)
+METADATA = os.path.join("data", "logs.pkl")
+
+
+def get_path(name: str) -> str:
+    # Nested dicts (e.g. families) are not tables
+    fp = os.path.join("data", f"{name}.pkl")
+    if os.path.exists(fp):
+        return fp
+    if FEATHER:
+        return os.path.join("data", f"{name}.feather")
+    # Fallback: one pickled column per file
+    return os.path.join("data", name)
+
+
+def exists(name: str) -> bool:
+    return os.path.exists(get_path(name))
+
+
+def remove(name: str):
+    path = get_path(name)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def write(df, name: str):
+    """
+    Stores a reference dataset in a columnar format (pickled if not a DataFrame).
+
+    :param df: DataFrame to be cached
+    :param name: Name of the dataset (e.g. "species")
+    """
+    import pandas as pd
+
+    if not os.path.exists("data"):
+        os.makedirs("data")
+
+    remove(name)
+    if not isinstance(df, pd.DataFrame):
+        with open(os.path.join("data", f"{name}.pkl"), "wb") as file:
+            pickle.dump(df, file)
+        return
+
+    df = df.copy()
+    df.insert(0, INDEX, df.index)
+    df = df.reset_index(drop=True)
+    # Column names must be strings
+    df.columns = [str(col) for col in df.columns]
+
+    path = get_path(name)
+    if FEATHER:
+        import pyarrow.feather as feather
+
+        # Uncompressed, so that it can be memory-mapped
+        feather.write_feather(df, path, compression="uncompressed")
+    else:
+        os.makedirs(path)
+        pd.Series(df.columns).to_pickle(os.path.join(path, "columns.pkl"))
+        for n, col in enumerate(df.columns):
+            df[col].to_pickle(os.path.join(path, f"{n}.pkl"))
+
+
+def read(name: str, columns: list = None):
+    """
+    Loads a reference dataset, reading only the requested columns.
+
+    :param name: Name of the dataset (e.g. "species")
+    :param columns: Columns to load (all if None, index only if empty)
+    """
+    path = get_path(name)
+    if path.endswith(".pkl"):
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    import pandas as pd
+
+    if FEATHER:
+        import pyarrow.feather as feather
+
+        if columns is not None:
+            columns = [INDEX] + list(columns)
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        df = table.to_pandas()
+    else:
+        stored = pd.read_pickle(os.path.join(path, "columns.pkl")).tolist()
+        df = pd.concat(
+            [
+                pd.read_pickle(os.path.join(path, f"{n}.pkl"))
+                for n, col in enumerate(stored)
+                if columns is None or col == INDEX or col in columns
+            ],
+            axis=1,
+        )
+
+    df = df.set_index(INDEX)
+    df.index.name = None
+
+    return df
+
+
+def load_metadata() -> dict:
+    try:
+        with open(METADATA, "rb") as file:
+            metadata = pickle.load(file)
+    except FileNotFoundError:
+        return {}
+
+    # Discard timestamps logged by older versions
+    return {k: v for k, v in metadata.items() if isinstance(v, dict)}
+
+
+def save_metadata(metadata: dict):
+    if not os.path.exists("data"):
+        os.makedirs("data")
+    with open(METADATA, "wb") as file:
+        pickle.dump(metadata, file)
@@ -0,0 +1,161 @@
+import gzip
+import struct
+import sys
+import threading
+import zlib
+
+# Uncompressed bytes per BGZF block (as in htslib)
+BLOCK_SIZE = 0xFF00
+
+# Empty block closing every BGZF file
+BGZF_EOF = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+SUFFIXES = {None: "", "gzip": ".gz", "bgzip": ".gz"}
+
+
+class BgzfFile:
+    """
+    Blocked gzip (BGZF) file, readable by any gzip reader and seekable with its .gzi index (e.g. samtools faidx).
+
+    :param path: Output file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "wb")
+        self.buffer = bytearray()
+        # (compressed, uncompressed) offsets of every block but the first
+        self.blocks = []
+        self.compressed = 0
+        self.uncompressed = 0
+
+    def write(self, data: bytes):
+        self.buffer += data
+        while len(self.buffer) >= BLOCK_SIZE:
+            self.write_block(BLOCK_SIZE)
+
+    def write_block(self, size: int):
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        deflated = compressor.compress(data) + compressor.flush()
+        # gzip header with the "BC" extra field holding the block size - 1
+        header = b"\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00"
+        block = header + struct.pack("<H", len(deflated) + 25) + deflated
+        block += struct.pack("<II", zlib.crc32(data), len(data))
+
+        if self.compressed:
+            self.blocks.append((self.compressed, self.uncompressed))
+        self.file.write(block)
+        self.compressed += len(block)
+        self.uncompressed += len(data)
+
+    def close(self):
+        if self.buffer:
+            self.write_block(len(self.buffer))
+        self.file.write(BGZF_EOF)
+        self.file.close()
+
+        with open(self.path + ".gzi", "wb") as file:
+            file.write(struct.pack("<Q", len(self.blocks)))
+            for offsets in self.blocks:
+                file.write(struct.pack("<QQ", *offsets))
+
+
+def get_fai(record: bytes, offset: int) -> str:
+    """
+    Returns the samtools faidx line of a FASTA record (name, length, offset, line bases, line width).
+
+    :param record: FASTA record (header and sequence lines)
+    :param offset: Uncompressed offset of the record in the file
+    """
+    header, _, sequence = record.partition(b"\n")
+    lines = sequence.splitlines(keepends=True) or [b""]
+    name = header[1:].split()[0].decode()
+    length = sum(len(line.rstrip(b"\r\n")) for line in lines)
+
+    return "{}\t{}\t{}\t{}\t{}\n".format(
+        name,
+        length,
+        offset + len(header) + 1,
+        len(lines[0].rstrip(b"\r\n")),
+        len(lines[0]),
+    )
+
+
+class Export:
+    """
+    Single multi-record export file, written record by record as they arrive (thread-safe).
+
+    An index is written next to it, unless gzip-compressed: a .fai for FASTA, or the offset and length of each entry
+    otherwise (.idx). Offsets refer to the uncompressed content, so with bgzip they are resolved through the .gzi.
+
+    :param path: Output file (without compression suffix), or "-" for stdout (not indexed, bgzip not supported)
+    :param format: Format of the records (e.g. "fasta")
+    :param compression: None, "gzip" or "bgzip"
+    :param footer: Closes the file (e.g. "</uniprot>" for XML)
+    """
+
+    def __init__(
+        self, path: str, format: str, compression: str = None, footer: bytes = b""
+    ):
+        self.path = path
+        if path != "-" and not path.endswith(SUFFIXES[compression]):
+            self.path += SUFFIXES[compression]
+        self.format = format
+        self.compression = compression
+        self.footer = footer
+
+        if path == "-":
+            if compression == "bgzip":
+                raise ValueError("bgzip cannot be written to stdout")
+            self.file = sys.stdout.buffer
+            if compression == "gzip":
+                self.file = gzip.GzipFile(fileobj=self.file, mode="wb")
+        elif compression == "gzip":
+            self.file = gzip.open(self.path, "wb")
+        elif compression == "bgzip":
+            self.file = BgzfFile(self.path)
+        else:
+            self.file = open(self.path, "wb")
+
+        # Written as records arrive, so memory stays constant
+        self.index = None
+        if compression != "gzip" and path != "-":
+            suffix = ".fai" if format == "fasta" else ".idx"
+            self.index = open(self.path + suffix, "w")
+
+        self.offset = 0
+        self.started = False
+        self.lock = threading.Lock()
+
+    def write(self, accession: str, header: bytes, body: bytes):
+        with self.lock:
+            # Header of the first record stands for all
+            if not self.started:
+                self.file.write(header)
+                self.offset += len(header)
+                self.started = True
+
+            if self.index is None:
+                pass
+            elif self.format == "fasta":
+                self.index.write(get_fai(body, self.offset))
+            else:
+                self.index.write(
+                    "{}\t{}\t{}\n".format(accession, self.offset, len(body))
+                )
+
+            self.file.write(body)
+            self.offset += len(body)
+
+    def close(self):
+        with self.lock:
+            self.file.write(self.footer)
+            if self.file is sys.stdout.buffer:
+                self.file.flush()
+            else:
+                self.file.close()
+            if self.index is not None:
+                self.index.close()
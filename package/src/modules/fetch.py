@@ -0,0 +1,500 @@
+import datetime
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from package.src.modules.export import Export
+from package.src.modules.retry import RETRIES, get_delay
+from package.src.modules.store import REVALIDATE_AFTER, RecordStore
+
+# Maximum number of requests sent at once
+MAX_WORKERS = 8
+
+# Wait (s) for the connection and for each read
+TIMEOUT = 60
+
+# Accessions per stream query (bounded by the URL length)
+BATCH_SIZE = 100
+BATCH_URL = "https://rest.uniprot.org/uniprotkb/stream"
+
+
+def split_fasta(lines):
+    """
+    Yields the (accession, header, record) of each entry of a FASTA stream (">sp|P12345|...").
+    """
+    accession, record = None, []
+    for line in lines:
+        if line.startswith(b">"):
+            if record:
+                yield accession, b"", b"".join(record)
+            accession, record = line.split(b"|")[1].decode(), []
+        record.append(line)
+    if record:
+        yield accession, b"", b"".join(record)
+
+
+def split_txt(lines):
+    """
+    Yields the (accession, header, record) of each entry of a flat file stream (entries end with "//").
+    """
+    accession, record = None, []
+    for line in lines:
+        record.append(line)
+        # First accession of the first AC line is the primary one
+        if accession is None and line.startswith(b"AC   "):
+            accession = line[5:].split(b";")[0].strip().decode()
+        if line.startswith(b"//"):
+            yield accession, b"", b"".join(record)
+            accession, record = None, []
+
+
+def split_gff(lines):
+    """
+    Yields the (accession, header, record) of each entry of a GFF stream (entries start with "##sequence-region").
+    """
+    header, accession, record = [], None, None
+    for line in lines:
+        if line.startswith(b"##sequence-region"):
+            if record:
+                yield accession, b"".join(header), b"".join(record)
+            accession, record = line.split()[1].decode(), []
+        if record is None:
+            header.append(line)
+        else:
+            record.append(line)
+    if record:
+        yield accession, b"".join(header), b"".join(record)
+
+
+def split_xml(lines):
+    """
+    Yields the (accession, header, record) of each entry of a UniProt XML stream (closed by FOOTERS["xml"]).
+    """
+    header, accession, record, started = [], None, None, False
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith(b"<entry"):
+            record, started = [line], True
+        elif record is not None:
+            record.append(line)
+            if accession is None and stripped.startswith(b"<accession>"):
+                accession = stripped[11 : stripped.index(b"<", 11)].decode()
+            if stripped.startswith(b"</entry>"):
+                yield accession, b"".join(header), b"".join(record)
+                accession, record = None, None
+        elif not started:
+            header.append(line)
+
+
+def classify_status(status: int) -> tuple:
+    """
+    Returns the reason of a failed response, and whether it is worth retrying.
+    """
+    if status in (404, 410):
+        return "Not found", False
+    if status == 429 or status >= 500:
+        return "Server error ({})".format(status), True
+    return "Request rejected ({})".format(status), False
+
+
+def classify(error: Exception) -> tuple:
+    """
+    Returns the reason of a failed download, and whether it is worth retrying.
+    """
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return classify_status(error.response.status_code)
+    if isinstance(error, requests.Timeout):
+        return "Timed out", True
+    if isinstance(
+        error, (requests.ConnectionError, requests.exceptions.ChunkedEncodingError)
+    ):
+        return "Connection error", True
+    if isinstance(error, requests.RequestException):
+        return "Request error", False
+    if isinstance(error, OSError):
+        return "Unable to write file", False
+
+    return type(error).__name__, False
+
+
+# Formats whose streams can be split back into entries (others are fetched one by one)
+SPLITTERS = {
+    "fasta": split_fasta,
+    "gff": split_gff,
+    "txt": split_txt,
+    "xml": split_xml,
+}
+FOOTERS = {"xml": b"</uniprot>\n"}
+
+# Entry version stated in each record, by format (others are looked up, see Fetch.get_versions). FASTA headers only
+# state the sequence version (SV=), which is not changed by annotation updates
+VERSIONS = {
+    "txt": re.compile(rb"\nDT   [^\n]*, entry version (\d+)\."),
+    "xml": re.compile(rb'<entry\s[^>]*\bversion="(\d+)"'),
+}
+
+
+def get_version(format: str, content: bytes) -> int:
+    """
+    Returns the entry version stated in a record, or None if it has none (e.g. FASTA, GFF).
+    """
+    pattern = VERSIONS.get(format)
+    match = pattern.search(content) if pattern else None
+    return int(match.group(1)) if match else None
+
+
+class Fetch:
+    """
+    Download of UniProt entries, run concurrently, over a pooled session (one keep-alive connection per worker).
+
+    In batched mode, entries are requested BATCH_SIZE at a time with accession:(A OR B ...) stream queries, and each
+    stream is split back into one file per entry as it arrives. Entries missing from a batch (e.g. requested by a
+    secondary accession) are then fetched one by one.
+
+    In single mode, all entries are streamed into one file (output, or export/uniprot-<timestamp>.<format>; "-" for
+    stdout), optionally gzip or bgzip compressed, and indexed (see Export).
+
+    Downloaded entries are kept in a local record store (see RecordStore) with their entry version. Later exports are
+    served from it, once the stored version is confirmed to be current (at most every REVALIDATE_AFTER), so that only
+    new or updated entries are downloaded.
+
+    When the server answers 429 (Too Many Requests), all workers pause for the time given by Retry-After before
+    trying again. Entries that fail on transient errors (timeouts, dropped connections, 5xx) are queued again with
+    exponential backoff; those still failing, or failing for good (e.g. not found), are returned with the reason of
+    each.
+
+    :param ids: List of UniProt accession numbers
+    :param format: Format of file to be downloaded (args: "txt", "fasta", "xml", "rdf/xml", "gff")
+    """
+
+    def __init__(
+        self,
+        ids: list,
+        format: str = "fasta",
+        max_workers: int = MAX_WORKERS,
+        batched: bool = True,
+        single: bool = False,
+        compression: str = None,
+        cached: bool = True,
+        output: str = None,
+    ):
+        self.ids = ids
+        self.format = format
+        self.max_workers = max_workers
+        self.batched = batched and format in SPLITTERS
+        self.single = single and format in SPLITTERS
+        self.compression = compression
+        self.output = output
+        self.export = None
+        self.cached = cached
+        self.records = None
+        # Current entry versions, by accession
+        self.versions = {}
+
+        # Shared pause requested by the server (rate limit)
+        self.resume_at = 0
+        self.lock = threading.Lock()
+
+    def wait_rate_limit(self):
+        with self.lock:
+            delay = self.resume_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def set_rate_limit(self, r: requests.Response, attempt: int):
+        delay = get_delay(attempt, r.headers)
+        with self.lock:
+            self.resume_at = max(self.resume_at, time.monotonic() + delay)
+
+    def get(self, session: requests.Session, url: str, **kwargs) -> requests.Response:
+        for attempt in range(RETRIES):
+            self.wait_rate_limit()
+            r = session.get(url, stream=True, timeout=TIMEOUT, **kwargs)
+            # Other transient failures are queued again by run (see fetch_later)
+            if r.status_code != 429:
+                break
+            r.close()
+            self.set_rate_limit(r, attempt)
+
+        return r
+
+    @staticmethod
+    def write(chunks, out_path: str):
+        # Incomplete files would be skipped by later exports
+        tmp = out_path + ".part"
+        with open(tmp, "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+        os.replace(tmp, out_path)
+
+    def keep(self, accession: str, content: bytes):
+        if self.records is not None:
+            version = get_version(self.format, content)
+            if version is None:
+                version = self.versions.get(accession)
+            self.records.put(accession, self.format, version, content)
+
+    def save(self, accession: str, header: bytes, record: bytes, path: str):
+        if self.export is not None:
+            self.export.write(accession, header, record)
+        else:
+            out_path = os.path.join(path, "{}.{}".format(accession, self.format))
+            self.write([header, record, FOOTERS.get(self.format, b"")], out_path)
+
+        self.keep(accession, header + record + FOOTERS.get(self.format, b""))
+
+    def fetch(self, session: requests.Session, id: str, path: str):
+        """
+        Downloads a single entry, streaming it to disk.
+        """
+        url = "https://www.uniprot.org/uniprot/{}.{}".format(id, self.format)
+        out_path = os.path.join(path, "{}.{}".format(id, self.format))
+
+        with self.get(session, url) as r:
+            r.raise_for_status()
+            if self.export is None:
+                self.write(r.iter_content(chunk_size=65536), out_path)
+                if self.records is not None:
+                    with open(out_path, "rb") as file:
+                        self.keep(id, file.read())
+                return
+
+            # Single file: one header, no footer
+            lines = (line + b"\n" for line in r.iter_lines())
+            for _, header, record in SPLITTERS[self.format](lines):
+                self.save(id, header, record, path)
+
+    def fetch_later(self, session: requests.Session, id: str, path: str, attempt: int):
+        # No wait before the first attempt (entries left out of a batch)
+        if attempt:
+            time.sleep(get_delay(attempt - 1))
+        self.fetch(session, id, path)
+
+    def fetch_batch(self, session: requests.Session, ids: list, path: str) -> set:
+        """
+        Downloads several entries with a single stream query, writing each one as soon as it is complete.
+
+        :return: Accessions downloaded (may be partial if the connection drops)
+        """
+        params = {
+            "format": self.format,
+            "query": "accession:({})".format(" OR ".join(ids)),
+        }
+        requested, written = set(ids), set()
+
+        try:
+            with self.get(session, BATCH_URL, params=params) as r:
+                if not r.ok:
+                    return written
+                lines = (line + b"\n" for line in r.iter_lines())
+                for accession, header, record in SPLITTERS[self.format](lines):
+                    # Matched through a secondary accession
+                    if accession not in requested or accession in written:
+                        continue
+                    self.save(accession, header, record, path)
+                    written.add(accession)
+        except requests.RequestException:
+            pass
+
+        return written
+
+    def get_versions(self, session: requests.Session, ids: list) -> dict:
+        """
+        Returns the current entry version of each accession (secondary accessions are left out).
+        """
+        params = {
+            "format": "tsv",
+            "fields": "accession,version",
+            "query": "accession:({})".format(" OR ".join(ids)),
+        }
+        versions = {}
+
+        try:
+            with self.get(session, BATCH_URL, params=params) as r:
+                if not r.ok:
+                    return versions
+                # Skip header
+                for line in list(r.iter_lines())[1:]:
+                    accession, version = line.decode().split("\t")
+                    versions[accession] = int(version)
+        except requests.RequestException:
+            pass
+
+        return versions
+
+    def get_cached(
+        self,
+        session: requests.Session,
+        executor: ThreadPoolExecutor,
+        ids: list,
+        path: str,
+    ) -> list:
+        """
+        Exports the entries whose stored version is current.
+
+        :return: Accessions still to be downloaded
+        """
+        stored = self.records.lookup(ids, self.format)
+        now = time.time()
+        # New entries are only looked up if their records do not state their version
+        stale = [
+            id
+            for id in ids
+            if (id in stored and now - stored[id]["checked"] > REVALIDATE_AFTER)
+            or (id not in stored and self.format not in VERSIONS)
+        ]
+        batches = [stale[i : i + BATCH_SIZE] for i in range(0, len(stale), BATCH_SIZE)]
+        for versions in executor.map(partial(self.get_versions, session), batches):
+            self.versions.update(versions)
+
+        missing, checked = [], []
+        for id in ids:
+            entry = stored.get(id)
+            if entry is None:
+                missing.append(id)
+                continue
+            if now - entry["checked"] <= REVALIDATE_AFTER:
+                content = self.records.read(id, self.format)
+            elif entry["version"] is not None and entry["version"] == self.versions.get(
+                id
+            ):
+                content = self.records.read(id, self.format)
+                checked.append(id)
+            else:
+                content = None
+            if content is None:
+                missing.append(id)
+                continue
+
+            if self.export is None:
+                out_path = os.path.join(path, "{}.{}".format(id, self.format))
+                self.write([content], out_path)
+            else:
+                lines = content.splitlines(keepends=True)
+                for _, header, record in SPLITTERS[self.format](lines):
+                    self.export.write(id, header, record)
+
+        self.records.set_checked(checked, self.format)
+
+        return missing
+
+    def run(self, progress=None) -> dict:
+        """
+        Downloads the UniProt entries supplied in the ids list.
+
+        :param progress: Callable receiving the number of entries done and the progress (0-100), as a tuple
+        :return: Reason of each failure, by accession
+        """
+        path = os.path.join("export")
+        # Reason of each failure, and number of attempts
+        failed, attempts = {}, {}
+
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        if self.single:
+            ids = list(dict.fromkeys(self.ids))
+            name = "uniprot-{:%Y%m%d-%H%M%S}.{}".format(
+                datetime.datetime.now(), self.format
+            )
+            self.export = Export(
+                path=self.output or os.path.join(path, name),
+                format=self.format,
+                compression=self.compression,
+                footer=FOOTERS.get(self.format, b""),
+            )
+        else:
+            # Already exported
+            ids = [
+                id
+                for id in self.ids
+                if not os.path.exists(
+                    os.path.join(path, "{}.{}".format(id, self.format))
+                )
+            ]
+        if self.cached:
+            self.records = RecordStore()
+
+        with requests.Session() as session:
+            adapter = HTTPAdapter(
+                pool_connections=self.max_workers, pool_maxsize=self.max_workers
+            )
+            session.mount("https://", adapter)
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                if self.records is not None:
+                    ids = self.get_cached(session, executor, ids, path)
+
+                count = len(self.ids) - len(ids)
+                if count and progress:
+                    progress((count, count / len(self.ids) * 100))
+
+                if self.batched:
+                    futures = {
+                        executor.submit(self.fetch_batch, session, batch, path): batch
+                        for batch in (
+                            ids[i : i + BATCH_SIZE]
+                            for i in range(0, len(ids), BATCH_SIZE)
+                        )
+                    }
+                else:
+                    futures = {
+                        executor.submit(self.fetch, session, id, path): id for id in ids
+                    }
+
+                pending = set(futures)
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        request = futures.pop(future)
+                        try:
+                            result, error = future.result(), None
+                        except Exception as e:
+                            result, error = set(), e
+
+                        if isinstance(request, list):
+                            count += len(result)
+                            # Fetch the rest one by one
+                            retries = [id for id in request if id not in result]
+                        elif error is None:
+                            count += 1
+                            retries = []
+                        else:
+                            reason, transient = classify(error)
+                            attempts[request] = attempts.get(request, 0) + 1
+                            if transient and attempts[request] < RETRIES:
+                                retries = [request]
+                            else:
+                                failed[request] = reason
+                                count += 1
+                                retries = []
+
+                        for id in retries:
+                            retry = executor.submit(
+                                self.fetch_later,
+                                session,
+                                id,
+                                path,
+                                attempts.get(id, 0),
+                            )
+                            futures[retry] = id
+                            pending.add(retry)
+
+                    if progress:
+                        progress((count, count / len(self.ids) * 100))
+
+        if self.export is not None:
+            self.export.close()
+            self.export = None
+        if self.records is not None:
+            self.records.evict()
+            self.records.close()
+            self.records = None
+
+        return failed
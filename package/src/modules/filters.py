@@ -0,0 +1,216 @@
+import datetime
+import multiprocessing
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from functools import partial
+
+from package.src.modules import (
+    get_db,
+    get_families,
+    get_pathways,
+    get_species,
+    get_subcell,
+    get_tissue,
+)
+from package.src.modules.stream import RELEASE_PATTERN, Stream
+
+# A few bytes stating the current UniProt release
+RELEASE_URL = "https://ftp.uniprot.org/pub/databases/uniprot/current_release/knowledgebase/complete/reldate.txt"
+
+# Maximum number of files downloaded at once
+MAX_WORKERS = 4
+
+# name: (module, CPU-heavy parse)
+SOURCES = {
+    "Databases": (get_db, False),
+    "Species": (get_species, True),
+    "Families": (get_families, False),
+    "Pathways": (get_pathways, True),
+    "Subcellular": (get_subcell, True),
+    "Tissues": (get_tissue, False),
+}
+
+
+def get_release() -> str:
+    for line in Stream(url=RELEASE_URL):
+        match = RELEASE_PATTERN.search(line)
+        if match:
+            return match.group(1).decode()
+
+
+class Filters:
+    """
+    Loads several reference datasets concurrently.
+
+    Downloads run on a bounded thread pool; the CPU-heavy parsers are handed to a process pool so they do not
+    contend on the GIL. Progress of all sources is reported through a single callback.
+
+    A source that fails (e.g. not found, connection lost) is reported on its own; the others are still loaded.
+
+    Sources with validators (metadata of a previous fetch) are revalidated with conditional requests; those that have
+    not changed are neither downloaded nor parsed and are reported with None as data.
+
+    In refresh mode, the current UniProt release is checked first: sources cached from that release are not requested
+    at all, and the others are only parsed/reported if the hash of their content changed.
+
+    :param names: Sources to be loaded (all if None)
+    :param validators: Metadata of the previous fetch of each source
+    :param refresh: Check the current release first
+    :param max_workers: Maximum number of files downloaded at once
+    """
+
+    def __init__(
+        self,
+        names: list = None,
+        validators: dict = None,
+        refresh: bool = False,
+        max_workers: int = MAX_WORKERS,
+    ):
+        self.names = names or list(SOURCES.keys())
+        self.validators = validators or {}
+        self.refresh = refresh
+        self.release = None
+        self.max_workers = max_workers
+        self.status = {name: 0 for name in self.names}
+        self.lock = threading.Lock()
+
+    def set_status(self, name: str, value: int, scale: float = 1.0):
+        with self.lock:
+            self.status[name] = int(value * scale)
+
+    def load(self, name: str, processes: ProcessPoolExecutor):
+        module, heavy = SOURCES[name]
+        previous = self.validators.get(name, {}).get("sha256")
+        # Keep the last 10% for parsing in a separate process
+        progress = partial(self.set_status, name, scale=0.9 if heavy else 1.0)
+        stream = Stream(
+            url=module.URL, progress=progress, validators=self.validators.get(name)
+        )
+
+        if not stream.modified:
+            data = None
+        elif not heavy:
+            data = module.parse(stream)
+        else:
+            lines = list(stream)
+            # Same content (e.g. new release, untouched file)
+            if stream.metadata["sha256"] == previous:
+                data = None
+            else:
+                try:
+                    data = processes.submit(module.parse, lines).result()
+                except BrokenProcessPool:
+                    data = module.parse(lines)
+        self.set_status(name, 100)
+
+        metadata = stream.metadata
+        if metadata.get("sha256") == previous:
+            data = None
+        # Current as of this release, also when not modified (the validators kept by Stream state an older one)
+        if self.release:
+            metadata["release"] = self.release
+
+        return data, metadata
+
+    def run(self, done, progress=None, error=None):
+        """
+        Loads the sources, in the order they complete.
+
+        :param done: Callable receiving a (name, data, metadata) tuple for each source
+        :param progress: Callable receiving the progress (0-100) of all sources, by name
+        :param error: Callable receiving a (name, reason) tuple for each source that failed
+        :raises Exception: First failure, if no error callable is given (once the other sources are loaded)
+        """
+        failed = []
+
+        def fail(name: str, e: Exception):
+            failed.append(e)
+            if error:
+                error((name, str(e)))
+
+        names = self.names
+        if self.refresh:
+            try:
+                self.release = get_release()
+            except OSError as e:
+                # Nothing can be revalidated either
+                for name in self.names:
+                    fail(name, e)
+                names = []
+            else:
+                names = self.check_release(done)
+
+        self.load_all(names, done, progress, fail)
+
+        if failed and not error:
+            raise failed[0]
+
+    def check_release(self, done) -> list:
+        """
+        Reports the sources cached from the current release as up to date.
+
+        :return: Sources still to be loaded
+        """
+        names = []
+        for name in self.names:
+            metadata = dict(self.validators.get(name, {}))
+            if metadata.get("release") != self.release:
+                names.append(name)
+                continue
+            # Up to date, nothing to download
+            metadata["checked"] = datetime.datetime.now()
+            self.set_status(name, 100)
+            done((name, None, metadata))
+
+        return names
+
+    def load_all(self, names: list, done, progress, fail):
+        if not names:
+            return
+
+        # One process per heavy source queued (none if there are none), spawned rather than forked from a threaded
+        # (e.g. Qt) process
+        heavy = sum(SOURCES[name][1] for name in names)
+        pool = (
+            ProcessPoolExecutor(
+                max_workers=min(heavy, self.max_workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            if heavy
+            else nullcontext()
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as threads, pool as processes:
+            futures = {
+                threads.submit(self.load, name, processes): name for name in names
+            }
+            pending, last = set(futures), None
+            while pending:
+                finished, pending = wait(
+                    pending, timeout=0.1, return_when=FIRST_COMPLETED
+                )
+
+                # Emit aggregate progress (only if changed)
+                with self.lock:
+                    status = dict(self.status)
+                if status != last and progress:
+                    last = status
+                    progress(status)
+
+                for future in finished:
+                    name = futures[future]
+                    try:
+                        data, metadata = future.result()
+                    except Exception as e:
+                        fail(name, e)
+                        continue
+                    done((name, data, metadata))
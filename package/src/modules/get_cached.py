@@ -0,0 +1,29 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from package.src.modules import cache
+
+# Only the columns needed by the comboboxes and selectors (index only if empty, all if None)
+COLUMNS = {
+    "Databases": ["Abbrev", "Name"],
+    "Species": ["Code", "Scientific name"],
+    "Families": None,
+    "Pathways": None,
+    "Subcellular": [],
+    "Tissues": [],
+}
+
+
+class GetCached(QThread):
+    """
+    Reads cached reference datasets off the GUI thread, reporting each one through done as (name, data).
+    """
+
+    done = pyqtSignal(tuple)
+
+    def __init__(self, names: list, parent=None):
+        QThread.__init__(self, parent)
+        self.names = names
+
+    def run(self):
+        for name in self.names:
+            self.done.emit((name, cache.read(name.lower(), columns=COLUMNS[name])))
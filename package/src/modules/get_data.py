@@ -1,61 +1,59 @@
-from io import BytesIO
-
 import pandas as pd
 import requests
 from PyQt5.QtCore import QThread, pyqtSignal
 
+from package.src.modules.search import COMPRESSED, Search
+
 
 class GetData(QThread):
+    """
+    Searches UniProtKB (see Search).
+
+    In incremental mode, records are emitted in batches as they arrive and done carries no DataFrame.
+    """
+
+    batch = pyqtSignal(object)
     done = pyqtSignal(tuple)
     error = pyqtSignal(str)
     progress = pyqtSignal(int)
 
-    def __init__(self, query, parent=None, columns: str = None):
+    def __init__(
+        self,
+        query,
+        parent=None,
+        columns: str = None,
+        incremental: bool = False,
+        compressed: bool = COMPRESSED,
+    ):
         QThread.__init__(self, parent)
-        self.query = query
-        self.columns = columns
+        self.search = Search(query=query, columns=columns, compressed=compressed)
+        self.incremental = incremental
 
     def run(self):
-        url = (
-            "https://rest.uniprot.org/uniprotkb/search?compressed=false&download=false"
-        )
-        url += "&fields=accession%2Creviewed%2Cid%2Cprotein_name%2Cgene_names%2Corganism_name%2Clength%2Cmass"
-        if self.columns:
-            url += f"%2C{self.columns}"
-        url += "&format=tsv"
-        url += f"&query={self.query}"
-
-        # TODO
-        print(url)
-
         try:
-            # Total number of hits
-            n = int(requests.get(url=url).headers.get("X-Total-Results"))
-
-            with requests.get(url=url.replace("search", "stream"), stream=True) as r:
-                # Create buffer
-                file = BytesIO()
-
-                # Track progress (number of lines)
-                last_n = 0
-                for i, line in enumerate(r.iter_lines()):
-                    file.write(line)
-                    # Add new line
-                    file.write("\n".encode())
-                    # Emit progress
-                    current_n = int(i / n * 100)
-                    if current_n > last_n:
-                        last_n = current_n
-                        self.progress.emit(current_n)
-
-                file.seek(0)
-                query_df = pd.read_csv(file, sep="\t", header=0)
-                file.close()
-
-            # Capitalize "Reviewed" column
-            query_df["Reviewed"] = query_df["Reviewed"].str.capitalize()
+            chunks, rows = [], 0
+            for chunk in self.search.get_batches(progress=self.progress.emit):
+                rows += chunk.shape[0]
+                if self.incremental:
+                    self.batch.emit(chunk)
+                else:
+                    chunks.append(chunk)
+
+            if not rows:
+                raise TypeError
+
+            if self.incremental:
+                self.done.emit((None, rows))
+                return
+
+            query_df = pd.concat(chunks, ignore_index=True)
+            del chunks
 
             self.done.emit((query_df, query_df.shape[0]))
 
         except TypeError:
             self.error.emit("No records found!")
+        except requests.HTTPError as e:
+            self.error.emit(f"Search failed ({e})")
+        except requests.RequestException:
+            self.error.emit("Connection lost!\nSearch again to resume.")
@@ -1,47 +1,41 @@
-import os
-import urllib.request
-from urllib.error import HTTPError
-
 from PyQt5.QtCore import QThread, pyqtSignal
 
+from package.src.modules.fetch import MAX_WORKERS, Fetch
+
 
 class GetUniProt(QThread):
+    """
+    Downloads UniProt entries (see Fetch), reporting those that failed through failed, with the reason of each.
+    """
+
     progress = pyqtSignal(tuple)
+    failed = pyqtSignal(dict)
     done = pyqtSignal()
 
-    def __init__(self, ids: list, format: str = "fasta", parent=None):
+    def __init__(
+        self,
+        ids: list,
+        format: str = "fasta",
+        max_workers: int = MAX_WORKERS,
+        batched: bool = True,
+        single: bool = False,
+        compression: str = None,
+        cached: bool = True,
+        parent=None,
+    ):
         QThread.__init__(self, parent)
-        self.ids = ids
-        self.format = format
+        self.fetch = Fetch(
+            ids=ids,
+            format=format,
+            max_workers=max_workers,
+            batched=batched,
+            single=single,
+            compression=compression,
+            cached=cached,
+        )
 
     def run(self):
-        """
-        Downloads the UniProt entries supplied in the ids list.
-
-        :param ids: List of UniProt accession numbers
-        :param format: Format of file to be downloaded (args: "txt", "fasta", "xml", "rdf/xml", "gff")
-        """
-        path = os.path.join("export")
-        failed = []
-
-        if not os.path.exists(path):
-            os.makedirs(path)
-
-        for _, id in enumerate(self.ids):
-            file = "{}.{}".format(id, self.format)
-            if not os.path.exists(os.path.join(path, file)):
-                try:
-                    url = "https://www.uniprot.org/uniprot/{}.{}".format(
-                        id, self.format
-                    )
-                    out_path = os.path.join(path, file)
-                    urllib.request.urlretrieve(url, out_path)
-                except HTTPError:
-                    failed.append(id)
-            else:
-                pass
-
-            progress = (_ + 1) / len(self.ids) * 100
-
-            self.progress.emit((_ + 1, progress))
+        failed = self.fetch.run(progress=self.progress.emit)
+        if failed:
+            self.failed.emit(failed)
         self.done.emit()
@@ -0,0 +1,35 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from package.src.modules.filters import MAX_WORKERS, SOURCES, Filters
+
+
+class GetFilters(QThread):
+    """
+    Loads several reference datasets concurrently (see Filters), reporting each source through done (or error, with
+    the reason it failed) and the progress of all sources through progress.
+    """
+
+    done = pyqtSignal(tuple)
+    error = pyqtSignal(tuple)
+    progress = pyqtSignal(dict)
+
+    def __init__(
+        self,
+        names: list = None,
+        validators: dict = None,
+        refresh: bool = False,
+        max_workers: int = MAX_WORKERS,
+        parent=None,
+    ):
+        QThread.__init__(self, parent)
+        self.filters = Filters(
+            names=names,
+            validators=validators,
+            refresh=refresh,
+            max_workers=max_workers,
+        )
+
+    def run(self):
+        self.filters.run(
+            done=self.done.emit, progress=self.progress.emit, error=self.error.emit
+        )
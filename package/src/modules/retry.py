@@ -0,0 +1,54 @@
+import datetime
+import email.utils
+
+import requests
+
+# Retry policy shared by all UniProt requests (see Search, Fetch and aio.Client)
+
+# Attempts per request, and wait (s) before the first retry (doubled each time, unless Retry-After is given)
+RETRIES = 5
+BACKOFF = 1
+
+# Errors worth retrying (dropped connections, timeouts)
+ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+def is_transient(status: int) -> bool:
+    """
+    Returns whether a response is worth retrying: 429 (Too Many Requests) or a server error.
+    """
+    return status == 429 or status >= 500
+
+
+def get_delay(attempt: int, headers=None, backoff: float = BACKOFF) -> float:
+    """
+    Returns the wait (s) before the next attempt: the Retry-After of the response (seconds or HTTP date), or
+    exponential backoff if it is missing or invalid.
+
+    :param attempt: Number of the failed attempt (from 0)
+    :param headers: Headers of the response, if any
+    :param backoff: Wait before the first retry
+    """
+    default = backoff * 2**attempt
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return default
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+
+    return max(
+        0.0, (date - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+    )
@@ -0,0 +1,304 @@
+import gzip
+import hashlib
+import os
+import pickle
+import shutil
+import time
+import zlib
+from io import BytesIO
+from itertools import chain
+
+import pandas as pd
+import requests
+
+from package.src.modules.retry import ERRORS, RETRIES, get_delay, is_transient
+
+# Number of records per page (maximum allowed by UniProt)
+SIZE = 500
+
+# Number of records yielded/concatenated at once
+CHUNKSIZE = 10000
+
+# Wait (s) for the connection and for each read
+TIMEOUT = 60
+
+# Checkpoints older than this are not resumed, e.g. across UniProt releases, and are removed (s)
+MAX_AGE = 24 * 60 * 60
+PATH = os.path.join("data", "searches")
+
+# Ask for gzip-compressed pages (TSV shrinks 5-10x over the wire)
+COMPRESSED = True
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class Search:
+    """
+    Search of UniProtKB, following the cursor of each page (Link: rel="next").
+
+    Pages are checkpointed to disk as they arrive (data/searches/), so that a search interrupted by a connection drop
+    or an app restart resumes from its last cursor (if saved within MAX_AGE). Failed pages are retried with
+    exponential backoff.
+
+    Pages are requested gzip-compressed (unless compressed is False) and decompressed as they arrive. If the server
+    rejects the request or sends an unreadable body, the search falls back to plain TSV.
+
+    :param query: URL-encoded UniProt query
+    :param columns: Extra fields (URL-encoded, comma-separated)
+    :param compressed: Request gzip-compressed pages
+    """
+
+    def __init__(self, query, columns: str = None, compressed: bool = COMPRESSED):
+        self.query = query
+        self.columns = columns
+        self.compressed = compressed
+
+        # Total number of hits (from the first page)
+        self.total = None
+        # Cursor of the next page (None once done), allows resuming
+        self.next_url = self.get_url()
+        # Number of records checkpointed
+        self.rows = 0
+
+        # Same checkpoint whether compressed or not
+        url = self.set_compressed(self.next_url, False)
+        key = hashlib.sha1(url.encode()).hexdigest()
+        self.path = os.path.join(PATH, key)
+        self.path_cursor = os.path.join(self.path, "cursor.pkl")
+        self.path_results = os.path.join(self.path, "results.tsv")
+
+    def get_url(self) -> str:
+        url = "https://rest.uniprot.org/uniprotkb/search?"
+        url += f"compressed={str(self.compressed).lower()}&download=false"
+        url += "&fields=accession%2Creviewed%2Cid%2Cprotein_name%2Cgene_names%2Corganism_name%2Clength%2Cmass"
+        if self.columns:
+            url += f"%2C{self.columns}"
+        url += "&format=tsv"
+        url += f"&size={SIZE}"
+        url += f"&query={self.query}"
+
+        return url
+
+    @staticmethod
+    def set_compressed(url: str, compressed: bool) -> str:
+        if compressed:
+            return url.replace("compressed=false", "compressed=true")
+        return url.replace("compressed=true", "compressed=false")
+
+    @staticmethod
+    def get_content(content: bytes) -> bytes:
+        # Not decoded by the client (no Content-Encoding), or sent as is
+        if content[:2] == GZIP_MAGIC:
+            content = gzip.decompress(content)
+        return content
+
+    @staticmethod
+    def format_page(page: pd.DataFrame) -> pd.DataFrame:
+        # Capitalize "Reviewed" column
+        page["Reviewed"] = page["Reviewed"].str.capitalize()
+        return page
+
+    def fall_back(self):
+        """
+        Requests the remaining pages as plain TSV.
+        """
+        self.compressed = False
+        self.next_url = self.set_compressed(self.next_url, False)
+
+    @staticmethod
+    def remove_expired():
+        """
+        Removes the checkpoints of all searches (e.g. abandoned or edited queries) saved more than MAX_AGE ago.
+        """
+        if not os.path.isdir(PATH):
+            return
+
+        now = time.time()
+        for entry in os.scandir(PATH):
+            cursor = os.path.join(entry.path, "cursor.pkl")
+            # Cursor is rewritten with each page
+            try:
+                saved = os.path.getmtime(
+                    cursor if os.path.exists(cursor) else entry.path
+                )
+            except OSError:
+                # Removed meanwhile (e.g. by another search)
+                continue
+            if now - saved > MAX_AGE:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def get_checkpoint(self):
+        """
+        Yields the records downloaded by a previous, interrupted run of the same search (expired checkpoints of all
+        searches are removed first).
+        """
+        self.remove_expired()
+        if not os.path.exists(self.path_cursor):
+            return
+
+        with open(self.path_cursor, "rb") as file:
+            checkpoint = pickle.load(file)
+        # Written by an older version, or too old to be resumed
+        if (
+            "size" not in checkpoint
+            or time.time() - checkpoint.get("saved", 0) > MAX_AGE
+        ):
+            shutil.rmtree(self.path, ignore_errors=True)
+            return
+
+        # Drop rows appended after the last saved cursor (pages are appended to them)
+        with open(self.path_results, "r+b") as file:
+            file.truncate(checkpoint["size"])
+
+        # None if all pages were saved
+        self.next_url = checkpoint["next_url"] and self.set_compressed(
+            checkpoint["next_url"], self.compressed
+        )
+        self.total = checkpoint["total"]
+        self.rows = checkpoint["rows"]
+
+        yield from pd.read_csv(
+            self.path_results,
+            sep="\t",
+            header=0,
+            nrows=self.rows,
+            chunksize=CHUNKSIZE,
+        )
+
+    def set_checkpoint(self, content: bytes):
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+
+        # Keep the header of the first page only
+        if os.path.exists(self.path_results):
+            content = content.split(b"\n", 1)[-1]
+        if not content.endswith(b"\n"):
+            content += b"\n"
+        with open(self.path_results, "ab") as file:
+            file.write(content)
+            size = file.tell()
+
+        tmp = self.path_cursor + ".tmp"
+        with open(tmp, "wb") as file:
+            pickle.dump(
+                {
+                    "next_url": self.next_url,
+                    "total": self.total,
+                    "rows": self.rows,
+                    # Length of the results matching the cursor
+                    "size": size,
+                    "saved": time.time(),
+                },
+                file,
+            )
+        os.replace(tmp, self.path_cursor)
+
+    def get_page(self, session: requests.Session) -> requests.Response:
+        for attempt in range(RETRIES):
+            headers = None
+            try:
+                r = session.get(url=self.next_url, timeout=TIMEOUT)
+                # Client errors (e.g. invalid query) are not worth retrying
+                if not is_transient(r.status_code):
+                    r.raise_for_status()
+                    return r
+                error = requests.HTTPError(f"{r.status_code} {r.reason}", response=r)
+                headers = r.headers
+            except ERRORS as e:
+                error = e
+
+            if attempt < RETRIES - 1:
+                time.sleep(get_delay(attempt, headers))
+
+        raise error
+
+    def read_page(self, headers, content: bytes) -> pd.DataFrame:
+        """
+        Parses and checkpoints a page, moving the cursor to the next one.
+
+        :param headers: Headers of the response (Link, X-Total-Results)
+        :param content: Body of the response
+        :return: Records of the page, or None if the search has no hits
+        :raises (OSError, EOFError, zlib.error): If the compressed body is unreadable (the cursor is not moved)
+        """
+        content = self.get_content(content)
+
+        if self.total is None:
+            self.total = int(headers.get("X-Total-Results"))
+        if not self.total:
+            self.next_url = None
+            return None
+
+        page = pd.read_csv(BytesIO(content), sep="\t", header=0)
+
+        links = requests.utils.parse_header_links(headers.get("Link", ""))
+        self.next_url = next(
+            (link["url"] for link in links if link.get("rel") == "next"), None
+        )
+        self.rows += page.shape[0]
+        self.set_checkpoint(content=content)
+
+        return page
+
+    def get_pages(self, session: requests.Session):
+        """
+        Yields one DataFrame per page, starting from the current cursor.
+
+        :param session: Session reused for all pages (keep-alive)
+        """
+        while self.next_url:
+            try:
+                r = self.get_page(session=session)
+                page = self.read_page(r.headers, r.content)
+            except requests.HTTPError as e:
+                # Compression not acceptable
+                if not self.compressed or e.response.status_code not in (406, 415):
+                    raise
+                self.fall_back()
+                continue
+            except (OSError, EOFError, zlib.error) as e:
+                # Unreadable compressed body (connection errors are not recovered here)
+                if not self.compressed or isinstance(e, requests.RequestException):
+                    raise
+                self.fall_back()
+                continue
+
+            if page is None:
+                return
+
+            yield page
+
+    def get_batches(self, progress=None):
+        """
+        Yields the results in DataFrames: the first page right away, then up to CHUNKSIZE records at once.
+
+        :param progress: Callable receiving the progress (0-100), by number of records
+        :raises requests.RequestException: If the search fails (it can be resumed, unless rejected by the server)
+        """
+        try:
+            with requests.Session() as session:
+                # Track progress (number of rows)
+                pending, rows, last_n = [], 0, 0
+                for page in chain(self.get_checkpoint(), self.get_pages(session)):
+                    pending.append(self.format_page(page))
+                    rows += page.shape[0]
+
+                    pending_rows = sum(p.shape[0] for p in pending)
+                    if pending_rows >= CHUNKSIZE or rows == pending_rows:
+                        yield pd.concat(pending, ignore_index=True)
+                        pending = []
+
+                    current_n = int(rows / self.total * 100)
+                    if current_n > last_n and progress:
+                        last_n = current_n
+                        progress(current_n)
+        except requests.HTTPError as e:
+            # Cannot be resumed (e.g. invalid query)
+            if e.response is not None and e.response.status_code in range(400, 429):
+                shutil.rmtree(self.path, ignore_errors=True)
+            raise
+
+        # Complete, checkpoint no longer needed
+        shutil.rmtree(self.path, ignore_errors=True)
+
+        if pending:
+            yield pd.concat(pending, ignore_index=True)
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# Local copies of exported entries, shared across exports and sessions
+PATH = os.path.join("data", "records")
+
+# Least recently used entries are evicted beyond this size (bytes)
+MAX_SIZE = 2 * 1024**3
+
+# Entries checked against the current UniProt version more recently are served as is (s)
+REVALIDATE_AFTER = 24 * 60 * 60
+
+
+class RecordStore:
+    """
+    Content-addressed store of UniProt entries, keyed by accession, entry version and format.
+
+    Contents are saved once per hash under objects/; an SQLite index maps each (accession, format) to its entry version,
+    hash, size, and the last time it was checked against UniProt and read. Thread-safe.
+
+    :param path: Directory of the store
+    :param max_size: Total size (bytes) kept by evict()
+    """
+
+    def __init__(self, path: str = PATH, max_size: int = MAX_SIZE):
+        self.path = path
+        self.max_size = max_size
+        self.lock = threading.Lock()
+
+        if not os.path.exists(path):
+            os.makedirs(path)
+        self.db = sqlite3.connect(
+            os.path.join(path, "index.sqlite"), check_same_thread=False
+        )
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "accession TEXT, format TEXT, version INTEGER, sha256 TEXT, size INTEGER, checked REAL, accessed REAL, "
+            "PRIMARY KEY (accession, format))"
+        )
+        self.db.commit()
+
+    def get_path(self, sha256: str) -> str:
+        return os.path.join(self.path, "objects", sha256[:2], sha256)
+
+    def lookup(self, accessions: list, format: str) -> dict:
+        """
+        Returns the version and last check time of the stored entries, by accession.
+        """
+        found = {}
+        accessions = list(accessions)
+        with self.lock:
+            # Bounded number of SQL variables
+            for i in range(0, len(accessions), 500):
+                batch = accessions[i : i + 500]
+                rows = self.db.execute(
+                    "SELECT accession, version, checked FROM records "
+                    "WHERE format = ? AND accession IN ({})".format(
+                        ",".join("?" * len(batch))
+                    ),
+                    [format] + batch,
+                )
+                for accession, version, checked in rows:
+                    found[accession] = {"version": version, "checked": checked}
+
+        return found
+
+    def read(self, accession: str, format: str) -> bytes:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT sha256 FROM records WHERE accession = ? AND format = ?",
+                (accession, format),
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE records SET accessed = ? WHERE accession = ? AND format = ?",
+                (time.time(), accession, format),
+            )
+            self.db.commit()
+
+        try:
+            with open(self.get_path(row[0]), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, accession: str, format: str, version: int, content: bytes):
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self.get_path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = "{}.{}.part".format(path, threading.get_ident())
+            with open(tmp, "wb") as file:
+                file.write(content)
+            os.replace(tmp, path)
+
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT sha256 FROM records WHERE accession = ? AND format = ?",
+                (accession, format),
+            ).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (accession, format, version, sha256, len(content), now, now),
+            )
+            self.db.commit()
+            # Previous version of the entry
+            if row is not None and row[0] != sha256:
+                self.remove_orphans([row[0]])
+
+    def set_checked(self, accessions: list, format: str):
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "UPDATE records SET checked = ? WHERE accession = ? AND format = ?",
+                [(now, accession, format) for accession in accessions],
+            )
+            self.db.commit()
+
+    def remove_orphans(self, hashes: list):
+        for sha256 in hashes:
+            (count,) = self.db.execute(
+                "SELECT COUNT(*) FROM records WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+            if not count:
+                try:
+                    os.remove(self.get_path(sha256))
+                except FileNotFoundError:
+                    pass
+
+    def evict(self):
+        """
+        Removes the least recently read contents until the store fits in max_size.
+        """
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT sha256, MAX(size), MAX(accessed) FROM records GROUP BY sha256 ORDER BY MAX(accessed) DESC"
+            ).fetchall()
+            total, evicted = 0, []
+            for sha256, size, _ in rows:
+                total += size
+                if total > self.max_size:
+                    evicted.append(sha256)
+            if not evicted:
+                return
+
+            self.db.executemany(
+                "DELETE FROM records WHERE sha256 = ?", [(h,) for h in evicted]
+            )
+            self.db.commit()
+            self.remove_orphans(evicted)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
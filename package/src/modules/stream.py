@@ -0,0 +1,138 @@
+import datetime
+import gzip
+import hashlib
+import re
+import ssl
+import urllib.request
+from urllib.error import HTTPError
+
+import certifi
+
+# e.g. "Release:     2024_01 of 24-Jan-2024"
+RELEASE_PATTERN = re.compile(rb"Release:?\s+(\d{4}_\d{2})")
+HEADER_LINES = 50
+
+# Ask for gzip content encoding (flat files shrink 5-10x over the wire)
+COMPRESSED = True
+
+# Wait (s) for the connection and for each read
+TIMEOUT = 60
+
+
+class Counter:
+    """
+    Counts the bytes read from a file object, i.e. those received rather than decompressed.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.count = 0
+
+    def read(self, size=-1) -> bytes:
+        data = self.file.read(size)
+        self.count += len(data)
+        return data
+
+    def readline(self) -> bytes:
+        data = self.file.readline()
+        self.count += len(data)
+        return data
+
+    def __iter__(self):
+        return iter(self.readline, b"")
+
+
+class Stream:
+    """
+    Remote file, fetched and parsed in a single pass.
+
+    Sends a conditional request when validators (ETag/Last-Modified) from a previous fetch are supplied. If the file
+    has not changed (304), `modified` is False and nothing is downloaded.
+
+    :param url: URL of the file
+    :param progress: Callable receiving the download progress (0-100), derived from Content-Length and bytes consumed
+    :param validators: Metadata of a previous fetch (keys: "etag", "last_modified")
+    :param compressed: Request gzip content encoding (decompressed on the fly; plain if the server does not support it)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        progress=None,
+        validators: dict = None,
+        compressed: bool = COMPRESSED,
+    ):
+        self.url = url
+        self.progress = progress
+        validators = validators or {}
+
+        request = urllib.request.Request(url)
+        if compressed:
+            request.add_header("Accept-Encoding", "gzip")
+        if validators.get("etag"):
+            request.add_header("If-None-Match", validators["etag"])
+        if validators.get("last_modified"):
+            request.add_header("If-Modified-Since", validators["last_modified"])
+
+        context = ssl.create_default_context(cafile=certifi.where())
+        try:
+            self.response = urllib.request.urlopen(
+                request, context=context, timeout=TIMEOUT
+            )
+        except HTTPError as error:
+            if error.code != 304:
+                raise
+            self.response = None
+
+        self.modified = self.response is not None
+        self.encoding = None
+        self.metadata = dict(validators)
+        self.metadata["fetched"] = datetime.datetime.now()
+        if self.modified:
+            headers = self.response.headers
+            self.metadata["etag"] = headers.get("ETag")
+            self.metadata["last_modified"] = headers.get("Last-Modified")
+            self.metadata["content_length"] = int(headers.get("Content-Length") or 0)
+            self.encoding = headers.get("Content-Encoding")
+            self.metadata.pop("release", None)
+
+    def __iter__(self):
+        if not self.modified:
+            return
+
+        total = self.metadata["content_length"]
+        last = 0
+        content_hash = hashlib.sha256()
+
+        if self.progress:
+            self.progress(0)
+
+        # Content-Length is the size of the encoded (compressed) body
+        counter = Counter(self.response)
+        if self.encoding == "gzip":
+            lines = gzip.GzipFile(fileobj=counter)
+        else:
+            lines = counter
+
+        with self.response:
+            for n, line in enumerate(lines):
+                consumed = counter.count
+                content_hash.update(line)
+                # Emit only when the percentage changes
+                if self.progress and total:
+                    current = consumed * 100 // total
+                    if current > last:
+                        last = current
+                        self.progress(current)
+
+                # Release is stated in the header
+                if n < HEADER_LINES and "release" not in self.metadata:
+                    match = RELEASE_PATTERN.search(line)
+                    if match:
+                        self.metadata["release"] = match.group(1).decode()
+
+                yield line
+
+        self.metadata["sha256"] = content_hash.hexdigest()
+        if self.progress and last < 100:
+            self.progress(100)
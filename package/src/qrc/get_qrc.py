@@ -1,4 +1,5 @@
-# Creates a .qr file with the icons and converts it to a .py file which can be imported in the main .py program/script
+# Creates a .qr file with the icons and converts it to a .py file which can be imported in the main .py program/script,
+# and to a binary .rcc file (loaded by resources.py)
 # Then use, e.g. ":/Icons/sample.png"
 
 # <RCC>
@@ -33,3 +34,6 @@ file.close()
 import subprocess
 
 subprocess.call("pyrcc5 {}.qrc -o {}.py".format("icons", "icons"))
+
+# Binary resources, registered at runtime (icons.py is the fallback)
+subprocess.call("rcc -binary {}.qrc -o {}.rcc".format("icons", "icons"))
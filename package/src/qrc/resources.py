@@ -0,0 +1,17 @@
+import os
+
+from PyQt5.QtCore import QResource
+
+# Binary resources (rcc -binary, see get_qrc.py), memory-mapped by Qt
+RCC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icons.rcc")
+
+
+def load():
+    """
+    Registers the icons (e.g. ":resources/icons/main.png") from icons.rcc, or from icons.py if it is missing.
+    """
+    if QResource.registerResource(RCC):
+        return
+
+    # Slower: the embedded bytes are compiled and executed
+    from package.src.qrc import icons  # noqa: F401 (registered on import)
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+# Launch time (main.py imports this module first)
+START = time.perf_counter()
+
+# Target time from launch to the first paint of the main window (s)
+BUDGET = float(os.environ.get("UNIGET_STARTUP_BUDGET", 1.0))
+
+# Set (e.g. UNIGET_PROFILE=1) to log the startup milestones to stderr
+PROFILE = bool(os.environ.get("UNIGET_PROFILE"))
+
+# Imported where first needed, so they should not be loaded by the first paint
+DEFERRED = ["pandas", "numpy", "pyarrow", "requests", "package.src.qrc.icons"]
+
+
+def get_elapsed() -> float:
+    return time.perf_counter() - START
+
+
+def mark(label: str):
+    if PROFILE:
+        sys.stderr.write(
+            "[startup] {:8.1f} ms  {}\n".format(get_elapsed() * 1000, label)
+        )
+
+
+def check(label: str = "first paint") -> bool:
+    """
+    Marks the end of the cold start. If PROFILE is set, reports the deferred modules already imported, and whether
+    BUDGET was exceeded (the import time of each module is given by python -X importtime main.py).
+
+    :param label: Name of the milestone
+    :return: Whether the cold start was within BUDGET
+    """
+    elapsed = get_elapsed()
+    mark(label)
+
+    if PROFILE:
+        loaded = [name for name in DEFERRED if name in sys.modules]
+        if loaded:
+            sys.stderr.write("[startup] imported early: {}\n".format(", ".join(loaded)))
+        if elapsed > BUDGET:
+            sys.stderr.write(
+                "[startup] over budget ({:.0f} ms > {:.0f} ms)\n".format(
+                    elapsed * 1000, BUDGET * 1000
+                )
+            )
+
+    return elapsed <= BUDGET
@@ -0,0 +1,52 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QComboBox
+
+
+class LazyComboBox(QComboBox):
+    """
+    QComboBox whose (many) items are only added once it is used: opened, focused, scrolled, or set from a table.
+    Their tooltips, if any, are set at the same time.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pending = []
+        self.tooltips = []
+
+    def add_lazy_items(self, items: list, tooltips: list = None):
+        """
+        :param items: Text of each item
+        :param tooltips: Tooltip of each item (none if None)
+        """
+        self.pending += items
+        self.tooltips += tooltips if tooltips is not None else [None] * len(items)
+
+    def populate(self):
+        if self.pending:
+            start = self.count()
+            items, self.pending = self.pending, []
+            tooltips, self.tooltips = self.tooltips, []
+            self.addItems(items)
+            for n, tooltip in enumerate(tooltips, start):
+                if tooltip is not None:
+                    self.setItemData(n, tooltip, Qt.ToolTipRole)
+
+    def clear(self):
+        self.pending, self.tooltips = [], []
+        super().clear()
+
+    def setCurrentText(self, text: str):
+        self.populate()
+        super().setCurrentText(text)
+
+    def showPopup(self):
+        self.populate()
+        super().showPopup()
+
+    def focusInEvent(self, event):
+        self.populate()
+        super().focusInEvent(event)
+
+    def wheelEvent(self, event):
+        self.populate()
+        super().wheelEvent(event)
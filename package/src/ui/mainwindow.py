@@ -1,6 +1,4 @@
-import datetime
 import os
-import pickle
 import platform
 import re
 import subprocess
@@ -9,24 +7,27 @@ import time
 import webbrowser
 from functools import partial
 
-import pandas as pd
-from PyQt5.QtCore import QRegExp, QSize, QSortFilterProxyModel, Qt
+from PyQt5.QtCore import QSize, Qt, QTimer
 from PyQt5.QtGui import QIcon, QMovie
 from PyQt5.QtWidgets import *
 
-from package.src.models.pandas import PandasModel
-from package.src.modules.get_data import GetData
-from package.src.modules.get_db import GetDBFilters
-from package.src.modules.get_families import GetFamiliesFilters
-from package.src.modules.get_file import GetUniProt
-from package.src.modules.get_pathways import GetPathwaysFilters
-from package.src.modules.get_species import GetSpeciesFilters
-from package.src.modules.get_subcell import GetSubcellFilters
-from package.src.modules.get_tissue import GetTissueFilters
-from package.src.qrc.icons import *
-from package.src.ui.about import About
-from package.src.ui.columns import TwoListSelection
-from package.src.ui.tree import ViewTree
+from package.src import startup
+from package.src.modules import cache
+from package.src.qrc import resources
+from package.src.ui.combo import LazyComboBox
+from package.src.ui.selector import Selector
+
+# pandas, the fetchers, and the dialogs are imported where first needed
+
+# Filter widget of each reference dataset
+COMBOS = {
+    "Databases": "db_combo",
+    "Species": "spec_combo",
+    "Families": "family_combo",
+    "Pathways": "pathway_toolbutton",
+    "Subcellular": "subcell_combo",
+    "Tissues": "tissue_combo",
+}
 
 
 class UniProtGet(QMainWindow):
@@ -35,6 +36,13 @@ class UniProtGet(QMainWindow):
 
         self.default_query = None
 
+        # Full reference tables, loaded lazily
+        self.tables = {}
+
+        # Sources being read from the cache (see load_cached), and their loaders
+        self.loading = set()
+        self.loaders = []
+
         self.initUI()
 
     def centre(self, window):
@@ -52,10 +60,9 @@ class UniProtGet(QMainWindow):
             sender.setStyleSheet(
                 "QComboBox {background-color: lightyellow; combobox-popup: 0}"
             )
-            try:
-                self.db_combo.setToolTip("\n".join(list(self.selected.keys())))
-            except AttributeError:
-                self.db_combo.setCurrentText("All")
+            # Nothing selected from the table
+            if not getattr(sender, "custom", None):
+                sender.setCurrentText("All")
         else:
             sender.setStyleSheet(
                 "QComboBox {background-color: None; combobox-popup: a0}"
@@ -99,6 +106,26 @@ class UniProtGet(QMainWindow):
         self.reset_gui()
 
     def download_records(self):
+        # Rows hidden by the review status filter are not exported
+        rows = self.table_model.get_checked(shown=True)
+        to_fetch = self.df.iloc[rows, 0].astype(str).tolist()
+
+        assert to_fetch, QMessageBox.warning(
+            self, "Warning", "Databases are still loading.\nWait for completion."
+        )
+
+        selected_format = self.statusbar_format.currentText()[1:]
+        single, compression = self.export_mode_group.checkedAction().data()
+        self.start_uniprot(
+            ids=to_fetch,
+            format=selected_format,
+            single=single,
+            compression=compression,
+        )
+
+    def start_uniprot(self, **kwargs):
+        from package.src.modules.get_file import GetUniProt
+
         self.statusBar().removeWidget(self.statusbar_fetch)
         self.statusbar_fetch.deleteLater()
         self.statusBar().removeWidget(self.statusbar_format)
@@ -108,85 +135,64 @@ class UniProtGet(QMainWindow):
         self.loading_gif.start()
         self.statusBar().addPermanentWidget(self.statusbar_fetch_loading)
 
-        to_fetch = []
-        for row in range(self.row_count):
-            if self.table.model().index(row, 0).data(Qt.CheckStateRole) == Qt.Checked:
-                to_fetch.append(self.table.model().index(row, 0).data())
-
-        assert to_fetch, QMessageBox.warning(
-            self, "Warning", "Databases are still loading.\nWait for completion."
-        )
-
         self.progressbar.show()
+        self.retry_failed_action.setEnabled(False)
 
-        selected_format = self.statusbar_format.currentText()[1:]
-        self.uniprot_get = GetUniProt(ids=to_fetch, format=selected_format)
+        # Kept to retry the failed records
+        self.uniprot_kwargs = kwargs
+        self.uniprot_get = GetUniProt(**kwargs)
         self.uniprot_get.progress.connect(self.get_uniprot_progress)
+        self.uniprot_get.failed.connect(self.get_uniprot_failed)
         self.uniprot_get.done.connect(self.get_uniprot_done)
         self.uniprot_get.start()
 
     def force_update(self):
-        try:
-            combos = [
-                self.db_combo,
-                self.spec_combo,
-                self.family_combo,
-                self.pathway_toolbutton,
-                self.subcell_combo,
-                self.tissue_combo,
-            ]
-            progressbars = [
-                self.db_progressbar,
-                self.spec_progressbar,
-                self.family_progressbar,
-                self.pathway_progressbar,
-                self.subcell_progressbar,
-                self.tissue_progressbar,
-            ]
-        except:
+        from package.src.modules.get_filters import SOURCES
+
+        # Replacing a running loader would destroy its thread
+        loader = getattr(self, "get_filters", None)
+        if self.loading or (loader is not None and loader.isRunning()):
             QMessageBox.warning(
                 self, "Warning", "Databases are still loading.\nWait for completion."
             )
             return
 
-        self.update_times = pickle.load(open(os.path.join("data", "logs.pkl"), "rb"))
-
-        msg_data = []
-        [msg_data.extend([k, v]) for k, v in self.update_times.items()]
+        # Sources that failed to load have no combobox
+        combos = [getattr(self, attr, None) for attr in COMBOS.values()]
+        combos = [combo for combo in combos if combo is not None]
+        progressbars = list(self.get_progressbars().values())
+
+        self.metadata = cache.load_metadata()
+
+        rows = ""
+        for name in SOURCES:
+            metadata = self.metadata.get(name, {})
+            fetched = metadata.get("fetched")
+            rows += (
+                "            <tr>\n"
+                "                <td style='padding: 2px'; align='center'>{}</td>\n"
+                "                <td style='padding: 2px'; align='center'>{}</td>\n"
+                "                <td style='padding: 2px'; align='center'>{}</td>\n"
+                "            </tr>\n"
+            ).format(
+                name,
+                metadata.get("release", "NA"),
+                fetched.strftime("%Y-%m-%d&nbsp;&nbsp;&nbsp;&nbsp;%H:%M:%S")
+                if fetched
+                else "NA",
+            )
         update_table = (
             "\n"
             "        <table border='1'>\n"
             "            <tr>\n"
             "                <th style='padding: 10px'; align='center'>Source</th>\n"
+            "                <th style='padding: 10px'; align='center'>Release</th>\n"
             "                <th style='padding: 10px'; align='center'>Timestamp</th>\n"
             "            </tr>\n"
-            "            <tr>\n"
-            "                <td style='padding: 2px'; align='center'>{}</td>\n"
-            "                <td style='padding: 2px'; align='center'>{}</td>\n"
-            "            </tr>\n"
-            "            <tr>\n"
-            "                <td style='padding: 2px'; align='center'>{}</td>\n"
-            "                <td style='padding: 2px'; align='center'>{}</td>\n"
-            "            </tr>\n"
-            "            <tr>\n"
-            "                <td style='padding: 2px'; align='center'>{}</td>\n"
-            "                <td style='padding: 2px'; align='center'>{}</td>\n"
-            "            </tr>\n"
-            "            <tr>\n"
-            "                <td style='padding: 2px'; align='center'>{}</td>\n"
-            "                <td style='padding: 2px'; align='center'>{}</td>\n"
-            "            </tr>\n"
-            "            <tr>\n"
-            "                <td style='padding: 2px'; align='center'>{}</td>\n"
-            "                <td style='padding: 2px'; align='center'>{}</td>\n"
-            "            </tr>\n"
-            "            <tr>\n"
-            "                <td style='padding: 2px'; align='center'>{}</td>\n"
-            "                <td style='padding: 2px'; align='center'>{}</td>\n"
-            "            </tr>\n"
+            "{}"
             "        </table>\n"
             "        "
-        ).format(*msg_data)
+        ).format(rows)
         msg = QMessageBox.question(
             self,
             "Update databases",
@@ -196,13 +202,6 @@ class UniProtGet(QMainWindow):
         )
 
         if msg == QMessageBox.Yes:
-            # Remove data
-            dir = "data"
-            for file in os.listdir(dir):
-                fp = os.path.join(dir, file)
-                if os.path.isfile(fp) and "columns.pkl" not in fp:
-                    os.remove(fp)
-
             # Clear and hide combobox
             for combo in combos:
                 # If QToolButton, hide only
@@ -214,10 +213,15 @@ class UniProtGet(QMainWindow):
 
             # Reset and show progressbar
             for progress in progressbars:
+                progress.setFormat("%p%")
                 progress.setValue(0)
                 progress.show()
 
-            self.get_data()
+            # Revalidate cached sources (unchanged ones are not downloaded again)
+            validators = {
+                k: v for k, v in self.metadata.items() if cache.exists(k.lower())
+            }
+            self.start_filters(validators=validators)
 
         else:
             return
@@ -242,7 +246,9 @@ class UniProtGet(QMainWindow):
                                         QPushButton:hover {border:0px;color:orange;font:22px bold;}"""
         )
 
-        self.button_db.clicked.connect(lambda: self.get_db_table(self.db_df))
+        self.button_db.clicked.connect(
+            lambda: self.get_db_table(self.get_cached_table("databases"))
+        )
         layout.addWidget(self.button_db, 1, 2)
 
         self.spec_label = QLabel("Species:")
@@ -260,7 +266,9 @@ class UniProtGet(QMainWindow):
                                           QPushButton:hover {border:0px;color:orange;font:22px bold;}"""
         )
 
-        self.button_spec.clicked.connect(lambda: self.get_spec_table(self.spec_df))
+        self.button_spec.clicked.connect(
+            lambda: self.get_spec_table(self.get_cached_table("species"))
+        )
         layout.addWidget(self.button_spec, 2, 2)
 
         self.review_label = QLabel("Review status:")
@@ -276,6 +284,38 @@ class UniProtGet(QMainWindow):
 
         return groupbox
 
+    def get_cached_table(self, name: str):
+        if name not in self.tables:
+            self.tables[name] = cache.read(name)
+        return self.tables[name]
+
+    def get_cached_done(self, data):
+        name, value = data
+        # Superseded by a fresh download
+        if name not in self.loading:
+            return
+        self.loading.discard(name)
+
+        if name == "Databases":
+            self.db_df = value
+            self.get_db_combo()
+        if name == "Species":
+            self.spec_df = value
+            self.get_spec_combo()
+        if name == "Families":
+            self.family_dict = value
+            self.get_families_combo()
+        if name == "Pathways":
+            self.pathway_dict = value
+            self.get_pathways_toolbutton()
+        if name == "Subcellular":
+            self.subcell_df = value
+            self.get_subcell_combo()
+        if name == "Tissues":
+            self.tissue_df = value
+            self.get_tissue_combo()
+        self.set_combo_style(name)
+
     def get_columns(self):
         columns = self.selector.get_selected()
         selected_columns = [
@@ -286,151 +326,52 @@ class UniProtGet(QMainWindow):
         self.set_default_query(format=selected_columns)
 
     def get_data(self):
-        # Refresh GUI
-        app.processEvents()
-
-        # Save update times for each database
-        try:
-            self.update_times = pickle.load(
-                open(os.path.join("data", "logs.pkl"), "rb")
-            )
-        except FileNotFoundError:
-            self.update_times = {}
-
-        # Databases
-        self.path_databases = os.path.join("data", "databases.pkl")
-        if not os.path.exists(self.path_databases):
-            self.get_db_filters = GetDBFilters()
-            self.get_db_filters.progress.connect(self.get_db_progress)
-            self.get_db_filters.done.connect(self.get_db_done)
-            self.get_db_filters.start()
-
-            self.update_times["Databases"] = datetime.datetime.now().strftime(
-                "%Y-%m-%d&nbsp;&nbsp;&nbsp;&nbsp;%H:%M:%S"
-            )
-        else:
-            self.db_df = pickle.load(open(self.path_databases, "rb"))
-            self.get_db_combo()
-
-        # Species
-        self.path_species = os.path.join("data", "species.pkl")
-        if not os.path.exists(self.path_species):
-            self.get_species_filters = GetSpeciesFilters()
-            self.get_species_filters.progress.connect(self.get_spec_progress)
-            self.get_species_filters.done.connect(self.get_spec_done)
-            self.get_species_filters.start()
-
-            self.update_times["Species"] = datetime.datetime.now().strftime(
-                "%Y-%m-%d&nbsp;&nbsp;&nbsp;&nbsp;%H:%M:%S"
-            )
-        else:
-            self.spec_df = pickle.load(open(self.path_species, "rb"))
-            self.get_spec_combo()
+        from package.src.modules.get_filters import SOURCES
 
-        # Families
-        self.path_families = os.path.join("data", "families.pkl")
-        if not os.path.exists(self.path_families):
-            self.get_families_filters = GetFamiliesFilters()
-            self.get_families_filters.progress.connect(self.get_families_progress)
-            self.get_families_filters.done.connect(self.get_families_done)
-            self.get_families_filters.start()
-
-            self.update_times["Families"] = datetime.datetime.now().strftime(
-                "%Y-%m-%d&nbsp;&nbsp;&nbsp;&nbsp;%H:%M:%S"
-            )
-        else:
-            self.family_dict = pickle.load(open(self.path_families, "rb"))
-            self.get_families_combo()
-
-        # Pathways
-        self.path_pathways = os.path.join("data", "pathways.pkl")
-        if not os.path.exists(self.path_pathways):
-            self.get_pathways_filters = GetPathwaysFilters()
-            self.get_pathways_filters.progress.connect(self.get_pathways_progress)
-            self.get_pathways_filters.done.connect(self.get_pathways_done)
-            self.get_pathways_filters.start()
-
-            self.update_times["Pathways"] = datetime.datetime.now().strftime(
-                "%Y-%m-%d&nbsp;&nbsp;&nbsp;&nbsp;%H:%M:%S"
-            )
-        else:
-            self.pathway_dict = pickle.load(open(self.path_pathways, "rb"))
-            self.get_pathways_toolbutton()
-
-        # Subcellular locations
-        self.path_subcellular = os.path.join("data", "subcellular.pkl")
-        if not os.path.exists(self.path_subcellular):
-            self.get_subcell_filters = GetSubcellFilters()
-            self.get_subcell_filters.progress.connect(self.get_subcell_progress)
-            self.get_subcell_filters.done.connect(self.get_subcell_done)
-            self.get_subcell_filters.start()
-
-            self.update_times["Subcellular"] = datetime.datetime.now().strftime(
-                "%Y-%m-%d&nbsp;&nbsp;&nbsp;&nbsp;%H:%M:%S"
-            )
-        else:
-            self.subcell_df = pickle.load(open(self.path_subcellular, "rb"))
-            self.get_subcell_combo()
+        # Release, validators and fetch time of each source
+        self.metadata = cache.load_metadata()
 
-        # Tissues
-        self.path_tissues = os.path.join("data", "tissues.pkl")
-        if not os.path.exists(self.path_tissues):
-            self.get_tissue_filters = GetTissueFilters()
-            self.get_tissue_filters.progress.connect(self.get_tissue_progress)
-            self.get_tissue_filters.done.connect(self.get_tissue_done)
-            self.get_tissue_filters.start()
+        # Sources to be fetched
+        cached, missing = [], []
+        for name in SOURCES:
+            if cache.exists(name.lower()):
+                cached.append(name)
+            else:
+                missing.append(name)
 
-            self.update_times["Tissues"] = datetime.datetime.now().strftime(
-                "%Y-%m-%d&nbsp;&nbsp;&nbsp;&nbsp;%H:%M:%S"
-            )
+        if cached:
+            self.load_cached(cached)
+        if missing:
+            self.start_filters(names=missing)
         else:
-            self.tissue_df = pickle.load(open(self.path_tissues, "rb"))
-            self.get_tissue_combo()
-
-        # Log timestamps of database updates
-        if not os.path.exists("data"):
-            os.makedirs("data")
-        with open(os.path.join("data", "logs.pkl"), "wb") as file:
-            pickle.dump(self.update_times, file)
-
-        try:
-            self.combos = {
-                "database": self.db_combo,
-                "species": self.spec_combo,
-                "methods": self.methods_combo,
-                "family": self.family_combo,
-                "pathway": self.pathway_toolbutton,
-                "location": self.subcell_combo,
-                "tissue": self.tissue_combo,
-            }
-            for k, v in self.combos.items():
-                v.setStyleSheet("combobox-popup: 0")
-                v.currentTextChanged.connect(partial(self.combo_changed, sender=v))
-        except AttributeError:
-            pass
+            # One small request when the UniProt release has not changed
+            self.start_filters(validators=self.metadata, refresh=True)
 
     def get_db_combo(self):
         self.groupbox_base_filters.layout().removeWidget(self.db_progressbar)
         self.db_progressbar.hide()
-        self.db_combo = QComboBox()
+        self.db_combo = Selector(["All", "Custom"])
         self.db_combo.setStyleSheet("combobox-popup: 0")
-        self.db_combo.addItems(["All", "Custom"])
         self.db_combo.setSizeAdjustPolicy(
             self.db_combo.AdjustToMinimumContentsLengthWithIcon
         )
-        self.db_combo.addItems(self.db_df["Abbrev"])
+        abbrevs = self.db_df["Abbrev"].tolist()
+        self.db_combo.set_entries(
+            keys=abbrevs,
+            labels=abbrevs,
+            terms=zip(abbrevs, self.db_df["Name"].tolist()),
+        )
         self.groupbox_base_filters.layout().addWidget(self.db_combo, 1, 1)
 
     def get_db_done(self, data):
-        with open(self.path_databases, "wb") as file:
-            pickle.dump(data, file)
+        cache.write(data, "databases")
+        self.tables["databases"] = data
         self.db_df = data
         self.get_db_combo()
 
-    def get_db_progress(self, progress):
-        self.db_progressbar.setValue(progress)
-
     def get_db_table(self, df):
+        from package.src.models.pandas import PandasModel
+
         self.db_table = QTableView()
         model = PandasModel(df)
         self.db_table.setModel(model)
@@ -457,14 +398,9 @@ class UniProtGet(QMainWindow):
         )
         dialog.rejected.connect(self.window.close)
         dialog.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-        filter_proxy_model = QSortFilterProxyModel()
-        filter_proxy_model.setSourceModel(model)
-        filter_proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
-        filter_proxy_model.setFilterKeyColumn(1)
         line = QLineEdit()
         line.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-        line.textChanged.connect(filter_proxy_model.setFilterRegExp)
-        self.db_table.setModel(filter_proxy_model)
+        line.textChanged.connect(partial(model.set_filter, 1))
         self.db_table.setSortingEnabled(True)
         self.db_table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
 
@@ -495,6 +431,9 @@ class UniProtGet(QMainWindow):
         self.methods_combo = QComboBox()
         self.methods_combo.setStyleSheet("combobox-popup: 0")
         self.methods_combo.addItems(list(self.methods.keys()))
+        self.methods_combo.currentTextChanged.connect(
+            partial(self.combo_changed, sender=self.methods_combo)
+        )
         layout.addWidget(self.methods_label, 1, 0)
         layout.addWidget(self.methods_combo, 1, 1)
 
@@ -522,6 +461,8 @@ class UniProtGet(QMainWindow):
         return groupbox
 
     def get_families_table(self, dict):
+        from package.src.ui.tree import ViewTree
+
         self.window = QWidget()
         self.window.setWindowTitle("Family table")
         self.window.setWindowModality(Qt.ApplicationModal)
@@ -539,18 +480,14 @@ class UniProtGet(QMainWindow):
         self.window.show()
 
     def get_families_done(self, data):
-        with open(self.path_families, "wb") as file:
-            pickle.dump(data, file)
+        cache.write(data, "families")
         self.family_dict = data
         self.get_families_combo()
 
-    def get_families_progress(self, progress):
-        self.family_progressbar.setValue(progress)
-
     def get_families_combo(self):
         self.groupbox_gene_filters.layout().removeWidget(self.family_progressbar)
         self.family_progressbar.hide()
-        self.family_combo = QComboBox()
+        self.family_combo = LazyComboBox()
 
         # TODO
         self.family_combo.setEnabled(False)
@@ -561,14 +498,80 @@ class UniProtGet(QMainWindow):
 
         self.family_combo.setStyleSheet("combobox-popup: 0")
         self.family_combo.addItem("All")
-        self.family_combo.addItems(list(self.family_dict.keys()))
-        for n, key in enumerate(self.family_dict.keys()):
-            self.family_combo.setItemData(n + 1, key, QtCore.Qt.ToolTipRole)
         self.family_combo.setSizeAdjustPolicy(
             self.family_combo.AdjustToMinimumContentsLengthWithIcon
         )
+        # Names may be truncated
+        families = list(self.family_dict.keys())
+        self.family_combo.add_lazy_items(families, tooltips=families)
         self.groupbox_gene_filters.layout().addWidget(self.family_combo, 1, 1)
 
+    def get_filters_done(self, data):
+        name, value, metadata = data
+        self.metadata[name] = metadata
+        cache.save_metadata(self.metadata)
+
+        combo = getattr(self, COMBOS[name], None)
+
+        # Not modified since last fetch
+        if value is None:
+            # Still shown (or being read) when refreshing in the background
+            if (combo is None or combo.isHidden()) and name not in self.loading:
+                self.load_cached([name])
+            return
+
+        # Replace the previous combobox (and its cached data, if still being read)
+        self.loading.discard(name)
+        if combo is not None:
+            combo.hide()
+
+        handlers = {
+            "Databases": self.get_db_done,
+            "Species": self.get_spec_done,
+            "Families": self.get_families_done,
+            "Pathways": self.get_pathways_done,
+            "Subcellular": self.get_subcell_done,
+            "Tissues": self.get_tissue_done,
+        }
+        handlers[name](value)
+        self.set_combo_style(name)
+
+    def get_filters_error(self, data):
+        name, reason = data
+        # The cached copy is kept (shown, or being read)
+        combo = getattr(self, COMBOS[name], None)
+        if name in self.loading or (combo is not None and not combo.isHidden()):
+            return
+
+        self.filter_errors[name] = reason
+        progressbar = self.get_progressbars()[name]
+        progressbar.setRange(0, 100)
+        progressbar.setValue(0)
+        progressbar.setFormat("Unavailable")
+
+    def get_filters_finished(self):
+        if not self.filter_errors:
+            return
+
+        reasons = "\n".join(
+            "{}: {}".format(name, reason) for name, reason in self.filter_errors.items()
+        )
+        QMessageBox.warning(
+            self,
+            "Warning",
+            "Unable to load:\n{}\n\nUpdate databases (Alt+U) to try again.".format(
+                reasons
+            ),
+        )
+
+    def get_filters_progress(self, status: dict):
+        progressbars = self.get_progressbars()
+        for name, value in status.items():
+            # Busy until read from the cache
+            if name not in self.loading:
+                progressbars[name].setMaximum(100)
+                progressbars[name].setValue(value)
+
     def get_gene_filters_groupbox(self):
         groupbox = QGroupBox("Genetic Filters")
         groupbox.setStyleSheet("QGroupBox {font: bold}")
@@ -649,7 +652,9 @@ class UniProtGet(QMainWindow):
         )
 
         self.button_subcell.clicked.connect(
-            lambda: self.get_subcell_table(self.subcell_df[["AC", "ID"]])
+            lambda: self.get_subcell_table(
+                self.get_cached_table("subcellular")[["AC", "ID"]]
+            )
         )
 
         self.tissue_label = QLabel("Tissue:")
@@ -665,7 +670,9 @@ class UniProtGet(QMainWindow):
         )
 
         self.button_tissue.clicked.connect(
-            lambda: self.get_tissue_table(self.tissue_df[["AC", "ID"]])
+            lambda: self.get_tissue_table(
+                self.get_cached_table("tissues")[["AC", "ID"]]
+            )
         )
 
         layout.addWidget(self.subcell_label, 7, 0)
@@ -741,6 +748,8 @@ class UniProtGet(QMainWindow):
         self.groupbox_gene_filters.layout().addWidget(self.pathway_toolbutton, 5, 1)
 
     def get_pathways_table(self, df):
+        from package.src.models.pandas import PandasModel
+
         self.pathway_table = QTableView()
         model = PandasModel(df)
         self.pathway_table.setModel(model)
@@ -772,15 +781,10 @@ class UniProtGet(QMainWindow):
         )
         dialog.rejected.connect(self.window.close)
         dialog.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-        filter_proxy_model = QSortFilterProxyModel()
-        filter_proxy_model.setSourceModel(model)
-        filter_proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
-        # Filter by "AC"
-        filter_proxy_model.setFilterKeyColumn(0)
         line = QLineEdit()
         line.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-        line.textChanged.connect(filter_proxy_model.setFilterRegExp)
-        self.pathway_table.setModel(filter_proxy_model)
+        # Filter by "AC"
+        line.textChanged.connect(partial(model.set_filter, 0))
 
         win_layout = QGridLayout()
         win_layout.addWidget(line, 0, 0, 1, 1)
@@ -790,14 +794,10 @@ class UniProtGet(QMainWindow):
         self.window.show()
 
     def get_pathways_done(self, data):
-        with open(self.path_pathways, "wb") as file:
-            pickle.dump(data, file)
+        cache.write(data, "pathways")
         self.pathway_dict = data
         self.get_pathways_toolbutton()
 
-    def get_pathways_progress(self, progress):
-        self.pathway_progressbar.setValue(progress)
-
     # TODO
     # def get_pathway_query(self, id: str):
     #     keys = ["HI", "HP"]
@@ -812,7 +812,19 @@ class UniProtGet(QMainWindow):
     #             uid.insert(0, str(parent_uid_to_int))
     #             get_parent(id=parent_key)
 
+    def get_progressbars(self) -> dict:
+        return {
+            "Databases": self.db_progressbar,
+            "Species": self.spec_progressbar,
+            "Families": self.family_progressbar,
+            "Pathways": self.pathway_progressbar,
+            "Subcellular": self.subcell_progressbar,
+            "Tissues": self.tissue_progressbar,
+        }
+
     def get_query(self):
+        from package.src.modules.get_data import GetData
+
         query = self.input.text()
         try:
             assert len(query) > 0
@@ -822,6 +834,13 @@ class UniProtGet(QMainWindow):
             error.showMessage("Query cannot be empty!")
             return
 
+        for name, combo in [("database", self.db_combo), ("species", self.spec_combo)]:
+            if combo.get_keys() is None:
+                error = QErrorMessage(self)
+                error.setWindowTitle("Warning")
+                error.showMessage(f"Unknown {name}: {combo.currentText()}")
+                return
+
         self.search_button.setEnabled(False)
         self.statusbar_record_count.setText("")
         self.input.setEnabled(False)
@@ -833,12 +852,16 @@ class UniProtGet(QMainWindow):
         # Queries
         query_uniprot = query.replace(" ", "%20")
 
-        db_query = self.db_combo.currentText()
-        if db_query != "All":
-            query_uniprot += f"%20AND%20database:{db_query}"
-        spec_query = self.spec_combo.currentText()
-        if spec_query != "All":
-            query_uniprot += f"%20AND%20organism_idnu:{spec_query}"
+        db_keys = self.db_combo.get_keys()
+        if db_keys:
+            query_uniprot += "%20AND%20({})".format(
+                "%20OR%20".join(f"database:{key}" for key in db_keys)
+            )
+        spec_keys = self.spec_combo.get_keys()
+        if spec_keys:
+            query_uniprot += "%20AND%20({})".format(
+                "%20OR%20".join(f"organism_idnu:{key}" for key in spec_keys)
+            )
         methods_query = self.methods_combo.currentText()
         if methods_query != "All":
             query_uniprot += f"%20AND%20method:{self.methods[methods_query]}"
@@ -876,7 +899,11 @@ class UniProtGet(QMainWindow):
         self.loading_label.show()
         self.loading_gif.start()
 
-        self.gen_table = GetData(query=query_uniprot, columns=self.default_query)
+        self.batch_count = 0
+        self.gen_table = GetData(
+            query=query_uniprot, columns=self.default_query, incremental=True
+        )
+        self.gen_table.batch.connect(self.update_batch)
         self.gen_table.done.connect(self.update_table)
         self.gen_table.error.connect(self.error_table)
         self.gen_table.progress.connect(self.set_progress)
@@ -891,17 +918,26 @@ class UniProtGet(QMainWindow):
                 self.selected[sender.model().index(row, 0).data()] = row
         self.window.close()
 
+        idx = int()
+        if flag == "db":
+            idx = 1
+        if flag == "spec":
+            idx = 0
+        if flag == "subcell":
+            idx = 0
+
         if len(self.selected) > 1:
-            combo.setCurrentText("Custom")
+            if isinstance(combo, Selector):
+                combo.set_custom(
+                    [
+                        sender.model().index(row, idx).data()
+                        for row in self.selected.values()
+                    ]
+                )
+            else:
+                combo.setCurrentText("Custom")
         elif len(self.selected) == 1:
             row_index = list(self.selected.values())[0]
-            idx = int()
-            if flag == "db":
-                idx = 1
-            if flag == "spec":
-                idx = 0
-            if flag == "subcell":
-                idx = 0
             combo.setCurrentText(sender.model().index(row_index, idx).data())
 
         # DEBUG
@@ -910,16 +946,24 @@ class UniProtGet(QMainWindow):
     def get_spec_combo(self):
         self.groupbox_base_filters.layout().removeWidget(self.spec_progressbar)
         self.spec_progressbar.hide()
-        self.spec_combo = QComboBox()
+        self.spec_combo = Selector(["All", "Custom"])
         self.spec_combo.setStyleSheet("combobox-popup: 0")
-        self.spec_combo.addItem("All")
         self.spec_combo.setSizeAdjustPolicy(
             self.spec_combo.AdjustToMinimumContentsLengthWithIcon
         )
-        self.spec_combo.addItems([str(k) for k in self.spec_df.index])
+        taxa = [str(k) for k in self.spec_df.index]
+        names = self.spec_df["Scientific name"].tolist()
+        codes = self.spec_df["Code"].tolist()
+        self.spec_combo.set_entries(
+            keys=taxa,
+            labels=[f"{n} ({c}, {t})" for n, c, t in zip(names, codes, taxa)],
+            terms=zip(names, codes, taxa),
+        )
         self.groupbox_base_filters.layout().addWidget(self.spec_combo, 2, 1)
 
     def get_spec_table(self, df):
+        from package.src.models.pandas import PandasModel
+
         self.spec_table = QTableView()
         model = PandasModel(df)
         self.spec_table.setModel(model)
@@ -946,18 +990,12 @@ class UniProtGet(QMainWindow):
         )
         dialog.rejected.connect(self.window.close)
         dialog.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-        filter_proxy_model = QSortFilterProxyModel()
-        filter_proxy_model.setSourceModel(model)
-        filter_proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
-        # Filter by "Scientific name"
-        filter_proxy_model.setFilterKeyColumn(3)
         line = QLineEdit()
         line.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-        line.textChanged.connect(filter_proxy_model.setFilterRegExp)
-        self.spec_table.setModel(filter_proxy_model)
-        # Sorting disabled for spec_table (too slow)
-        # self.spec_table.setSortingEnabled(True)
-        # self.spec_table.sortByColumn(3, Qt.SortOrder.AscendingOrder)
+        # Filter by "Scientific name"
+        line.textChanged.connect(partial(model.set_filter, 3))
+        self.spec_table.setSortingEnabled(True)
+        self.spec_table.sortByColumn(3, Qt.SortOrder.AscendingOrder)
 
         win_layout = QGridLayout()
         win_layout.addWidget(line, 0, 0, 1, 1)
@@ -967,37 +1005,33 @@ class UniProtGet(QMainWindow):
         self.window.show()
 
     def get_spec_done(self, data):
-        with open(self.path_species, "wb") as file:
-            pickle.dump(data, file)
+        cache.write(data, "species")
+        self.tables["species"] = data
         self.spec_df = data
         self.get_spec_combo()
 
-    def get_spec_progress(self, progress):
-        self.spec_progressbar.setValue(progress)
-
     def get_subcell_combo(self):
         self.groupbox_gene_filters.layout().removeWidget(self.subcell_progressbar)
         self.subcell_progressbar.hide()
-        self.subcell_combo = QComboBox()
+        self.subcell_combo = LazyComboBox()
         self.subcell_combo.setStyleSheet("combobox-popup: 0")
         self.subcell_combo.addItem("All")
         self.subcell_combo.setSizeAdjustPolicy(
             self.subcell_combo.AdjustToMinimumContentsLengthWithIcon
         )
-        self.subcell_combo.addItems(sorted(self.subcell_df.index.tolist()))
+        self.subcell_combo.add_lazy_items(sorted(self.subcell_df.index.tolist()))
         self.groupbox_gene_filters.layout().addWidget(self.subcell_combo, 7, 1)
 
     def get_subcell_done(self, data):
-        with open(self.path_subcellular, "wb") as file:
-            pickle.dump(data, file)
+        cache.write(data, "subcellular")
+        self.tables["subcellular"] = data
         self.subcell_df = data
 
         self.get_subcell_combo()
 
-    def get_subcell_progress(self, progress):
-        self.subcell_progressbar.setValue(progress)
-
     def get_subcell_table(self, df):
+        from package.src.models.pandas import PandasModel
+
         self.subcell_table = QTableView()
         model = PandasModel(df)
         self.subcell_table.setModel(model)
@@ -1026,14 +1060,9 @@ class UniProtGet(QMainWindow):
         )
         dialog.rejected.connect(self.window.close)
         dialog.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-        filter_proxy_model = QSortFilterProxyModel()
-        filter_proxy_model.setSourceModel(model)
-        filter_proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
-        filter_proxy_model.setFilterKeyColumn(0)
         line = QLineEdit()
         line.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-        line.textChanged.connect(filter_proxy_model.setFilterRegExp)
-        self.subcell_table.setModel(filter_proxy_model)
+        line.textChanged.connect(partial(model.set_filter, 0))
         self.subcell_table.setSortingEnabled(True)
         self.subcell_table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
 
@@ -1047,26 +1076,25 @@ class UniProtGet(QMainWindow):
     def get_tissue_combo(self):
         self.groupbox_gene_filters.layout().removeWidget(self.tissue_progressbar)
         self.tissue_progressbar.hide()
-        self.tissue_combo = QComboBox()
+        self.tissue_combo = LazyComboBox()
         self.tissue_combo.setStyleSheet("combobox-popup: 0")
         self.tissue_combo.addItem("All")
         self.tissue_combo.setSizeAdjustPolicy(
             self.tissue_combo.AdjustToMinimumContentsLengthWithIcon
         )
-        self.tissue_combo.addItems(sorted(self.tissue_df.index.tolist()))
+        self.tissue_combo.add_lazy_items(sorted(self.tissue_df.index.tolist()))
         self.groupbox_gene_filters.layout().addWidget(self.tissue_combo, 8, 1)
 
     def get_tissue_done(self, data):
-        with open(self.path_tissues, "wb") as file:
-            pickle.dump(data, file)
+        cache.write(data, "tissues")
+        self.tables["tissues"] = data
         self.tissue_df = data
 
         self.get_tissue_combo()
 
-    def get_tissue_progress(self, progress):
-        self.tissue_progressbar.setValue(progress)
-
     def get_tissue_table(self, df):
+        from package.src.models.pandas import PandasModel
+
         self.tissue_table = QTableView()
         model = PandasModel(df)
         self.tissue_table.setModel(model)
@@ -1095,14 +1123,9 @@ class UniProtGet(QMainWindow):
         )
         dialog.rejected.connect(self.window.close)
         dialog.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-        filter_proxy_model = QSortFilterProxyModel()
-        filter_proxy_model.setSourceModel(model)
-        filter_proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
-        filter_proxy_model.setFilterKeyColumn(1)
         line = QLineEdit()
         line.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-        line.textChanged.connect(filter_proxy_model.setFilterRegExp)
-        self.tissue_table.setModel(filter_proxy_model)
+        line.textChanged.connect(partial(model.set_filter, 1))
         self.tissue_table.setSortingEnabled(True)
         self.tissue_table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
 
@@ -1133,6 +1156,22 @@ class UniProtGet(QMainWindow):
         self.progressbar.hide()
         self.progressbar.setValue(0)
 
+    def get_uniprot_failed(self, failed: dict):
+        self.failed_ids = list(failed.keys())
+        self.retry_failed_action.setEnabled(True)
+
+        reasons = {}
+        for reason in failed.values():
+            reasons[reason] = reasons.get(reason, 0) + 1
+        QMessageBox.warning(
+            self,
+            "Warning",
+            "{} records could not be exported:\n{}\n\nUse Edit > Retry failed exports to try again.".format(
+                len(failed),
+                "\n".join(f"{reason}: {n}" for reason, n in reasons.items()),
+            ),
+        )
+
     def get_uniprot_progress(self, value):
         progress_id, progress_value = value
         self.progressbar.setValue(int(progress_value))
@@ -1247,7 +1286,23 @@ class UniProtGet(QMainWindow):
         self.centre(window=self)
         self.show()
 
-        self.get_data()
+        # After the first paint, so that startup does not depend on the size of the cache
+        QTimer.singleShot(0, self.get_data)
+
+    def load_cached(self, names: list):
+        from package.src.modules.get_cached import GetCached
+
+        progressbars = self.get_progressbars()
+        for name in names:
+            self.loading.add(name)
+            # Busy placeholder until the combobox is filled
+            progressbars[name].setRange(0, 0)
+
+        loader = GetCached(names=names)
+        loader.done.connect(self.get_cached_done)
+        loader.finished.connect(partial(self.loaders.remove, loader))
+        self.loaders.append(loader)
+        loader.start()
 
     def reset_gui(self):
         self.search_button.setEnabled(True)
@@ -1286,7 +1341,7 @@ class UniProtGet(QMainWindow):
             msg_data.extend(
                 [
                     k.capitalize(),
-                    [v.currentText() if type(v) is QComboBox else v.text()][0],
+                    [v.currentText() if isinstance(v, QComboBox) else v.text()][0],
                 ]
             )
             for k, v in self.combos.items()
@@ -1332,6 +1387,21 @@ class UniProtGet(QMainWindow):
             QMessageBox.Close,
         )
 
+    def set_checked(self, value: bool):
+        try:
+            model = self.table_model
+        except AttributeError:
+            return
+
+        # Only the rows shown by the review status filter
+        model.set_checked(value=value, mask=model.get_rows())
+
+    def set_combo_style(self, name: str):
+        # Highlights the filters in use
+        combo = getattr(self, COMBOS[name])
+        if isinstance(combo, QComboBox):
+            combo.currentTextChanged.connect(partial(self.combo_changed, sender=combo))
+
     def set_default_query(self, format: str):
         self.default_query = format
         self.selector.close()
@@ -1353,6 +1423,9 @@ class UniProtGet(QMainWindow):
         edit_menu.addSeparator()
         self.open_downloads_action = QAction("Open downloads directory", self)
         edit_menu.addAction(self.open_downloads_action)
+        self.retry_failed_action = QAction("Retry failed exports", self)
+        self.retry_failed_action.setEnabled(False)
+        edit_menu.addAction(self.retry_failed_action)
 
         view_menu = QMenu("View", self)
         view_menu.setIcon(QIcon.fromTheme("edit-find"))
@@ -1376,6 +1449,19 @@ class UniProtGet(QMainWindow):
         settings_menu.addAction(self.update_db_action)
         self.update_db_action.setShortcut("Alt+U")
         self.update_db_action.triggered.connect(self.toolbutton_click)
+        export_menu = settings_menu.addMenu("Export to")
+        self.export_mode_group = QActionGroup(self)
+        for text, mode in [
+            ("One file per entry", (False, None)),
+            ("Single file", (True, None)),
+            ("Single file (gzip)", (True, "gzip")),
+            ("Single file (bgzip, indexed)", (True, "bgzip")),
+        ]:
+            action = QAction(text, self.export_mode_group)
+            action.setCheckable(True)
+            action.setData(mode)
+            action.setChecked(not mode[0])
+            export_menu.addAction(action)
 
         menu.addAction(self.open_action)
         menu.addAction(self.save_action)
@@ -1398,6 +1484,7 @@ class UniProtGet(QMainWindow):
         self.select_none_action.setShortcut("Ctrl+Z")
         self.open_downloads_action.triggered.connect(self.toolbutton_click)
         self.open_downloads_action.setShortcut("Ctrl+D")
+        self.retry_failed_action.triggered.connect(self.toolbutton_click)
         self.view_query_action.triggered.connect(self.toolbutton_click)
         self.view_query_action.setShortcut("Alt+Q")
         self.about_action.triggered.connect(self.toolbutton_click)
@@ -1423,13 +1510,11 @@ class UniProtGet(QMainWindow):
 
             # Set filtering based on review status
             # ^/&: start/end delimiters
-            self.proxy_model.setFilterRegExp(
-                QRegExp(
-                    ""
-                    if status[current_state] == "Unspecified"
-                    else "^" + status[current_state] + "$",
-                    Qt.CaseInsensitive,
-                )
+            self.table_model.set_filter(
+                1,
+                ""
+                if status[current_state] == "Unspecified"
+                else "^" + status[current_state] + "$",
             )
             self.statusbar_record_count.setText(
                 f" {self.table.model().rowCount()} records"
@@ -1445,8 +1530,22 @@ class UniProtGet(QMainWindow):
                 error.showMessage("Cannot set review status when no data is loaded!")
             self.review_check.setCheckState(Qt.Unchecked)
 
+    def start_filters(self, **kwargs):
+        from package.src.modules.get_filters import GetFilters
+
+        # Reason of each source that failed
+        self.filter_errors = {}
+        self.get_filters = GetFilters(**kwargs)
+        self.get_filters.progress.connect(self.get_filters_progress)
+        self.get_filters.done.connect(self.get_filters_done)
+        self.get_filters.error.connect(self.get_filters_error)
+        self.get_filters.finished.connect(self.get_filters_finished)
+        self.get_filters.start()
+
     def toolbutton_click(self):
         if self.sender() is self.open_action:
+            import pandas as pd
+
             try:
                 name = QFileDialog.getOpenFileName(
                     self, "Open file", filter="csv(*.csv)"
@@ -1472,14 +1571,10 @@ class UniProtGet(QMainWindow):
             sys.exit(0)
 
         if self.sender() is self.select_all_action:
-            for row in range(self.row_count):
-                index = self.table.model().index(row, 0)
-                self.table.model().setData(index, Qt.Checked, Qt.CheckStateRole)
+            self.set_checked(value=True)
 
         if self.sender() is self.select_none_action:
-            for row in range(self.row_count):
-                index = self.table.model().index(row, 0)
-                self.table.model().setData(index, Qt.Unchecked, Qt.CheckStateRole)
+            self.set_checked(value=False)
 
         if self.sender() is self.open_downloads_action:
             path = os.path.abspath(os.path.join("export"))
@@ -1493,10 +1588,15 @@ class UniProtGet(QMainWindow):
             else:
                 subprocess.Popen(["xdg-open", path])
 
+        if self.sender() is self.retry_failed_action:
+            self.start_uniprot(**dict(self.uniprot_kwargs, ids=self.failed_ids))
+
         if self.sender() is self.view_query_action:
             self.show_query()
 
         if self.sender() is self.select_columns_action:
+            from package.src.ui.columns import TwoListSelection
+
             self.selector = TwoListSelection()
             self.selector.setWindowModality(Qt.ApplicationModal)
             self.selector.signal.connect(self.get_columns)
@@ -1512,12 +1612,44 @@ class UniProtGet(QMainWindow):
             webbrowser.open("mailto:?to=" + recipient + "&subject=" + subject, new=1)
 
         if self.sender() is self.about_action:
+            from package.src.ui.about import About
+
             self.about_widget = About()
             self.about_widget.setWindowModality(Qt.ApplicationModal)
             self.centre(window=self.about_widget)
             self.about_widget.show()
 
+    def show_table(self):
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.horizontalHeader().setMinimumSectionSize(150)
+        self.table.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+
+        if self.output_widget.isHidden():
+            self.output_widget.show()
+            self.setMinimumSize(self.sizeHint())
+            self.setMaximumSize(QWIDGETSIZE_MAX, QWIDGETSIZE_MAX)
+            self.centre(window=self)
+
+    def update_batch(self, data):
+        from package.src.models.pandas import PandasModel
+
+        # First rows of the query, show them while the rest is downloading
+        if self.batch_count == 0:
+            self.table_model = PandasModel(data)
+            self.table.setSortingEnabled(False)
+            self.table.setModel(self.table_model)
+            self.show_table()
+        else:
+            self.table_model.append(data)
+        self.batch_count += 1
+
+        self.statusbar_record_count.setText(
+            "  {} records (loading...)".format(self.table_model.rowCount())
+        )
+
     def update_table(self, data):
+        from package.src.models.pandas import PandasModel
+
         # Done with fetching data, hide progressbar
         self.progressbar.hide()
         self.progressbar.setFixedWidth(100)
@@ -1526,23 +1658,21 @@ class UniProtGet(QMainWindow):
         self.df, self.row_count = data
         self.statusbar_record_count.setText("  {} records".format(self.row_count))
 
-        model = PandasModel(self.df)
-        self.proxy_model = QSortFilterProxyModel(self)
-        self.proxy_model.setSourceModel(model)
-        # Filter review status of record
-        self.proxy_model.setFilterKeyColumn(1)
-        self.table.setModel(self.proxy_model)
+        if self.df is None:
+            # Rows already shown while downloading
+            self.df = self.table_model.get_data()
+        else:
+            self.table_model = PandasModel(self.df)
+            self.table.setModel(self.table_model)
+
+        # Sort and filter once all rows are in
         self.table.setSortingEnabled(True)
         self.table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.horizontalHeader().setMinimumSectionSize(150)
-        self.table.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        if self.review_check.checkState() != Qt.Unchecked:
+            self.set_review_status()
 
         self.reset_gui()
-        self.output_widget.show()
-        self.setMinimumSize(self.sizeHint())
-        self.setMaximumSize(QWIDGETSIZE_MAX, QWIDGETSIZE_MAX)
-        self.centre(window=self)
+        self.show_table()
 
         self.statusbar_fetch.setEnabled(True)
         self.statusbar_format.setEnabled(True)
@@ -1553,6 +1683,12 @@ class UniProtGet(QMainWindow):
 
 def run():
     global app
+    startup.mark("imports")
     app = QApplication(sys.argv)
+    resources.load()
+    startup.mark("resources")
+    # First event loop iteration, before the cached datasets are read (see initUI)
+    QTimer.singleShot(0, startup.check)
     upg = UniProtGet()
+    startup.mark("window")
     sys.exit(app.exec_())
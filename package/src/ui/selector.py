@@ -0,0 +1,105 @@
+from PyQt5.QtWidgets import QComboBox, QCompleter
+
+from package.src.models.suggestions import LIMIT, SearchIndex, SuggestionModel
+
+
+class Selector(QComboBox):
+    """
+    Searchable selector: an editable combobox holding only its fixed items (e.g. "All"), which suggests entries
+    matching the typed text (see SearchIndex) instead of listing all of them.
+
+    Several entries (e.g. checked in a table) are selected together as "Custom" (a fixed item).
+
+    :param items: Fixed items
+    """
+
+    def __init__(self, items: list, parent=None):
+        super().__init__(parent)
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.NoInsert)
+        self.addItems(items)
+
+        self.keys, self.labels = [], []
+        self.by_key, self.by_label = {}, {}
+        self.index = SearchIndex([])
+        # Keys selected as "Custom"
+        self.custom = []
+
+        self.suggestions = SuggestionModel(self.labels, self)
+        completer = QCompleter(self.suggestions, self)
+        # Already matched by the index
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        completer.setMaxVisibleItems(LIMIT // 5)
+        self.setCompleter(completer)
+        self.lineEdit().textEdited.connect(self.suggest)
+
+    def set_entries(self, keys: list, labels: list, terms: list):
+        """
+        :param keys: Value of each entry in the query (e.g. taxon)
+        :param labels: Shown text of each entry
+        :param terms: Search terms of each entry (e.g. scientific name, code, and taxon)
+        """
+        self.keys, self.labels = list(keys), list(labels)
+        self.by_key = {key: n for n, key in enumerate(self.keys)}
+        self.by_label = {label: n for n, label in enumerate(self.labels)}
+        self.index = SearchIndex(terms)
+        self.suggestions.set_labels(self.labels)
+
+    def suggest(self, text: str):
+        self.suggestions.set_rows(self.index.search(text))
+        if self.suggestions.rowCount():
+            self.completer().complete()
+        else:
+            self.completer().popup().hide()
+
+    def set_custom(self, keys: list):
+        self.custom = list(keys)
+        self.setToolTip(
+            "\n".join(
+                self.labels[self.by_key[key]] if key in self.by_key else key
+                for key in self.custom
+            )
+        )
+        super().setCurrentText("Custom")
+
+    def setCurrentText(self, text: str):
+        # Keys (e.g. selected from the table) are shown by their label
+        if text in self.by_key:
+            text = self.labels[self.by_key[text]]
+        super().setCurrentText(text)
+
+    def get_value(self) -> str:
+        """
+        Returns the key of the current text (a label, a key, or the search term of one entry), the text itself if it is
+        a fixed item (the first one if empty), or None if it matches no entry.
+        """
+        text = self.currentText().strip()
+        if not text:
+            return self.itemText(0)
+        if self.findText(text) >= 0:
+            return text
+        if text in self.by_label:
+            return self.keys[self.by_label[text]]
+        if text in self.by_key:
+            return text
+
+        entries = self.index.find(text)
+        if len(entries) == 1:
+            return self.keys[entries.pop()]
+
+        return None
+
+    def get_keys(self) -> list:
+        """
+        Returns the keys selected: none for the first fixed item ("All"), those set by set_custom for "Custom", or the
+        key of the current text (None if it matches no entry, see get_value).
+        """
+        value = self.get_value()
+        if value is None:
+            return None
+        if value == self.itemText(0):
+            return []
+        if value == "Custom":
+            return list(self.custom)
+
+        return [value]